@@ -4,3 +4,10 @@ set -o errexit
 
 # Install dependencies
 pip install -r requirements.txt
+
+# Optionally compile generate_keys.py to a C extension with mypyc.
+# The compiled module takes precedence on import (e.g. `python -c "import generate_keys"`).
+if [ "${COMPILE_WITH_MYPYC:-0}" = "1" ]; then
+    pip install mypy
+    mypyc generate_keys.py
+fi
@@ -1,14 +1,41 @@
 # Environment configuration for PythonAnywhere
-import secrets
+# Keep this module stdlib-only at import time so key generation starts fast;
+# init_db.py is the only entry point that loads main (FastAPI/SQLAlchemy).
+import base64
+import os
+from typing import Tuple
+
+
+def _mint(raw: bytes) -> str:
+    # 32 random bytes -> 43 unpadded base64url chars, same as token_urlsafe(32)
+    return base64.urlsafe_b64encode(raw)[:43].decode("ascii")
 
 
 # Generate secure secret keys (run this once to generate keys, then use the generated keys)
-def generate_secret_keys():
-    secret_key = secrets.token_urlsafe(32)
-    refresh_secret_key = secrets.token_urlsafe(32)
+def generate_secret_keys() -> Tuple[str, str]:
+    # One read for both keys
+    raw = os.urandom(64)
+    secret_key = _mint(raw[:32])
+    refresh_secret_key = _mint(raw[32:])
     print(f"SECRET_KEY={secret_key}")
     print(f"REFRESH_SECRET_KEY={refresh_secret_key}")
+    return secret_key, refresh_secret_key
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate JWT secret keys")
+    parser.add_argument(
+        "--also-seed",
+        action="store_true",
+        help="also initialize the database (loads the full app)",
+    )
+    args = parser.parse_args()
+
     generate_secret_keys()
+    if args.also_seed:
+        # Loaded by name so mypyc doesn't try to compile the whole app
+        import importlib
+
+        importlib.import_module("init_db").init_database()
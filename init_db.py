@@ -1,45 +1,199 @@
 #!/usr/bin/env python3
 """
 Database initialization script for PythonAnywhere deployment
+
+Run from the project root with `python -m init_db`. Pass --fresh on a
+brand-new database to skip the per-table existence checks, and
+--dedupe-budget-entries to delete duplicate budget entries (all but the newest
+per user and month) so the unique budget index can be built.
 """
+import argparse
+import base64
+import contextlib
+import csv
+import io
 import os
-import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from sqlalchemy import literal, select
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from main import (
+    Base,
+    engine,
+    SessionLocal,
+    User,
+    budget_index_blocked,
+    dedupe_budget_entries,
+)
+
+# Warm up the bcrypt backend (cheapest cost) before any DB work starts
+bcrypt.hashpw(b"warmup", bcrypt.gensalt(rounds=4))
+
+
+# bcrypt's base64 uses the standard bit layout with its own alphabet
+_BCRYPT_B64 = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+)
+
+
+def make_salts(count, rounds=12):
+    """Build count bcrypt salts (same format as gensalt) from one urandom read"""
+    raw = os.urandom(16 * count)
+    prefix = b"$2b$%02d$" % rounds
+    return [
+        prefix + base64.b64encode(raw[i : i + 16])[:22].translate(_BCRYPT_B64)
+        for i in range(0, len(raw), 16)
+    ]
+
+
+def _hash_password(password, salt):
+    # Call bcrypt directly; main verifies these $2b$ hashes with bcrypt.checkpw
+    return bcrypt.hashpw(password.encode(), salt).decode()
+
+
+def hash_passwords(passwords, rounds=12):
+    """Hash passwords in parallel, one bcrypt call per core"""
+    salts = make_salts(len(passwords), rounds)
+    if len(passwords) == 1:
+        # Not worth the pool startup cost for a single hash
+        return [_hash_password(passwords[0], salts[0])]
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return list(executor.map(_hash_password, passwords, salts, chunksize=8))
+
+
+def seed_users(db, rows):
+    """Insert pre-hashed user rows in a single round-trip"""
+    if not rows:
+        return
 
-# Add project directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if engine.dialect.name == "postgresql":
+        # COPY streams every row in one statement
+        buf = io.StringIO()
+        csv.writer(buf).writerows(
+            (row["username"], row["hashed_password"]) for row in rows
+        )
+        buf.seek(0)
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                "COPY users (username, hashed_password) FROM STDIN CSV", buf
+            )
+        finally:
+            cursor.close()
+    else:
+        # executemany on SQLite/MySQL, skipping ORM unit-of-work bookkeeping
+        db.bulk_insert_mappings(User, rows)
+
+
+def create_tables_sqlite(if_not_exists=True, skip_indexes=()):
+    """Create all tables and indexes on SQLite with one executescript call"""
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(CreateTable(table, if_not_exists=if_not_exists))
+        statements.extend(
+            CreateIndex(index, if_not_exists=if_not_exists)
+            for index in table.indexes
+            if index.name not in skip_indexes
+        )
+    ddl = ";\n".join(
+        str(statement.compile(dialect=engine.dialect)).strip()
+        for statement in statements
+    )
+
+    raw = engine.raw_connection()
+    try:
+        # Parsed once and journaled as a single transaction
+        raw.executescript(f"BEGIN;\n{ddl};\nCOMMIT;")
+    finally:
+        raw.close()
+
+
+def seed_admin(db, rounds):
+    """Add the default admin user if missing; the caller commits"""
+    # Existence probe only; avoids hydrating a full User row
+    exists_q = select(literal(1)).where(User.username == "admin").limit(1)
+    if db.execute(exists_q).scalar() is not None:
+        return False
 
-from main import Base, engine, get_db, User, pwd_context
+    users = [("admin", "admin123")]  # Change this password!
+    # Hash before inserting so bcrypt doesn't run inside the write
+    hashes = hash_passwords([password for _, password in users], rounds)
+    rows = [
+        {"username": username, "hashed_password": hashed_password}
+        for (username, _), hashed_password in zip(users, hashes)
+    ]
+    seed_users(db, rows)
+    return True
 
 
-def init_database():
+def remove_duplicate_budget_entries():
+    """Delete duplicate budget entries, printing each row removed"""
+    removed = dedupe_budget_entries()
+    for row in removed:
+        print(
+            f"Removed budget entry id={row.id} user_id={row.user_id} "
+            f"{row.month} {row.year} salary={row.salary} created_at={row.created_at}"
+        )
+    print(f"Removed {len(removed)} duplicate budget entries")
+
+
+def init_database(fresh=False, dedupe=False):
     """Initialize the database and create tables"""
+    if dedupe:
+        remove_duplicate_budget_entries()
+    skip_indexes = ()
+    if not fresh and budget_index_blocked():
+        # Building it would fail; leave it out until the duplicates are resolved
+        print(
+            "Duplicate budget entries found; skipping uq_budget_user_year_month. "
+            "Re-run with --dedupe-budget-entries to keep only the newest entry "
+            "per user and month."
+        )
+        skip_indexes = ("uq_budget_user_year_month",)
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    if engine.dialect.name == "sqlite":
+        # IF NOT EXISTS replaces the per-table probes unless the DB is fresh
+        create_tables_sqlite(if_not_exists=not fresh, skip_indexes=skip_indexes)
+    else:
+        # One transaction for all DDL; a fresh database needs no existence probes
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn, checkfirst=not fresh)
     print("Database tables created successfully!")
 
-    # Create a default admin user if it doesn't exist
-    db = next(get_db())
-    try:
-        admin_user = db.query(User).filter(User.username == "admin").first()
-        if not admin_user:
-            hashed_password = pwd_context.hash("admin123")  # Change this password!
-            admin_user = User(
-                username="admin",
-                email="admin@example.com",
-                hashed_password=hashed_password,
-            )
-            db.add(admin_user)
-            db.commit()
-            print("Default admin user created: username='admin', password='admin123'")
-            print("Please change the default password after first login!")
-        else:
-            print("Admin user already exists")
-    except Exception as e:
-        print(f"Error creating admin user: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    # Only the seed hash uses this; main rehashes it to Argon2 on first login
+    rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+    with contextlib.closing(SessionLocal()) as db:
+        try:
+            # All seeding shares one transaction, committed once on exit
+            with db.begin():
+                admin_created = seed_admin(db, rounds)
+        except Exception as e:
+            print(f"Error creating admin user: {e}")
+            return
+
+    if admin_created:
+        print("Default admin user created: username='admin', password='admin123'")
+        print("Please change the default password after first login!")
+    else:
+        print("Admin user already exists")
 
 
 if __name__ == "__main__":
-    init_database()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="database is known to be empty; create tables without checking",
+    )
+    parser.add_argument(
+        "--dedupe-budget-entries",
+        action="store_true",
+        help="delete all but the newest budget entry per user and month",
+    )
+    args = parser.parse_args()
+    init_database(fresh=args.fresh, dedupe=args.dedupe_budget_entries)
@@ -1,17 +1,76 @@
 from fastapi import FastAPI, Request, Depends, HTTPException, status, Form, Response
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import (
+    HTMLResponse,
+    ORJSONResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
-from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy import (
+    case,
+    create_engine,
+    delete,
+    event,
+    inspect as inspect_db,
+    func,
+    Column,
+    Computed,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    Text,
+    Index,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import declarative_base, load_only, sessionmaker, Session
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.schema import CreateColumn
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHash, VerificationError
+from pydantic import BaseModel
+import jwt
+from jwt import PyJWTError as JWTError
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
+from enum import Enum
+from functools import partial
+from urllib.parse import parse_qs
+from anyio import to_thread
+from cachetools import TTLCache
+from jinja2 import FileSystemBytecodeCache
+from openpyxl import Workbook
 import sqlite3
+import tempfile
+import csv
+import io
 import json
+import bcrypt
+import hashlib
+import inspect
 import logging
+import multiprocessing
+import numpy as np
+import orjson
 import os
+import threading
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # Only the Parquet/Feather downloads need pyarrow
+    pa = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,15 +81,46 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./budget.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=(
-        {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-    ),
-)
+# Connection pool sizing; the request threadpool is capped to match
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+# Set when DATABASE_URL points at PgBouncer in transaction mode; it does the pooling
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
+
+if DATABASE_URL.startswith("sqlite"):
+    # File-backed SQLite already gets a QueuePool in SQLAlchemy 2.x
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+
+elif DB_PGBOUNCER:
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", "./.jinja_cache")
+
+# Most recent items listed in edit page sidebars
+SIDEBAR_LIMIT = 50
+
 # Security - Use environment variables or defaults
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 REFRESH_SECRET_KEY = os.getenv(
@@ -42,7 +132,30 @@ REFRESH_TOKEN_EXPIRE_DAYS = (
     365  # 1 year (effectively no expiration for user convenience)
 )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2id for new hashes; existing bcrypt hashes still verify and are
+# upgraded on the next successful login
+password_hasher = PasswordHasher(time_cost=5, memory_cost=7168, parallelism=1)
+
+# Auth caches - skip JWT decode and user/refresh-token lookups for repeat
+# requests within AUTH_CACHE_TTL seconds. Keys are token digests, never raw tokens.
+AUTH_CACHE_TTL = 30
+_access_cache = TTLCache(
+    maxsize=10000, ttl=AUTH_CACHE_TTL
+)  # digest -> (payload, until)
+_refresh_cache = TTLCache(maxsize=10000, ttl=AUTH_CACHE_TTL)  # digest -> user_id
+_user_cache = TTLCache(maxsize=1000, ttl=AUTH_CACHE_TTL)  # user_id -> detached User
+_auth_cache_lock = threading.Lock()
+
+# Encoded /api/chart-data bodies. The key carries the user's generation, which is
+# bumped whenever their budget entries change, so stale bodies are never served.
+CHART_CACHE_TTL = 60
+_chart_cache = TTLCache(maxsize=1000, ttl=CHART_CACHE_TTL)
+_chart_gen = {}  # user_id -> generation
+_chart_cache_lock = threading.Lock()
+# Yearly chart bodies, keyed the same way. The generation lives in this process,
+# so with several workers an edit made through another worker only shows up
+# once the entry expires; keep the TTL as short as /api/chart-data's.
+_yearly_cache = TTLCache(maxsize=1000, ttl=CHART_CACHE_TTL)
 
 
 # Models
@@ -56,17 +169,31 @@ class User(Base):
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Lookups only ever want live tokens, so keep revoked ones out of this index
+        Index(
+            "ix_refresh_token_active",
+            "token",
+            sqlite_where=text("is_revoked = 0"),
+            postgresql_where=text("is_revoked = 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer)
     token = Column(String, unique=True, index=True)
     expires_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
     is_revoked = Column(Integer, default=0)
 
 
 class BudgetEntry(Base):
     __tablename__ = "budget_entries"
+    __table_args__ = (
+        # One entry per user and month; also the conflict target for upserts
+        Index("uq_budget_user_year_month", "user_id", "year", "month", unique=True),
+        Index("ix_budget_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer)
@@ -99,11 +226,169 @@ class BudgetEntry(Base):
     fixed_deposit_two = Column(Float, default=0.0)
     etf = Column(Float, default=0.0)
 
-    created_at = Column(DateTime, default=datetime.now)
+    # Totals, kept up to date by the database on every write
+    total_income = Column(Float, Computed("salary + freelancing_one + freelancing_two"))
+    total_expenses = Column(
+        Float,
+        Computed(
+            "mobile_recharge + wifi + emi_one + emi_two + emi_three + emi_four"
+            " + food + rent + creditcard_one + creditcard_two + shopping + travel"
+            " + other_expenses"
+        ),
+    )
+    total_investments = Column(
+        Float, Computed("sip + fixed_deposit_one + fixed_deposit_two + etf")
+    )
+    emi_total = Column(Float, Computed("emi_one + emi_two + emi_three + emi_four"))
+    creditcard_total = Column(Float, Computed("creditcard_one + creditcard_two"))
+
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+
+
+# Per-section columns of a budget entry, in chart order
+CHART_FIELDS = {
+    "income": ("salary", "freelancing_one", "freelancing_two"),
+    "expenses": (
+        "mobile_recharge",
+        "wifi",
+        "emi_one",
+        "emi_two",
+        "emi_three",
+        "emi_four",
+        "food",
+        "rent",
+        "creditcard_one",
+        "creditcard_two",
+        "shopping",
+        "travel",
+        "other_expenses",
+    ),
+    "savings": ("sip", "fixed_deposit_one", "fixed_deposit_two", "etf"),
+}
+
+# Per-month breakdowns in the yearly chart; EMIs and credit cards are charted
+# only as their precomputed totals
+YEARLY_BREAKDOWNS = {
+    "income_breakdown": ("salary", "freelancing_one", "freelancing_two"),
+    "expense_breakdown": (
+        "mobile_recharge",
+        "wifi",
+        "emi_total",
+        "food",
+        "rent",
+        "creditcard_total",
+        "shopping",
+        "travel",
+        "other_expenses",
+    ),
+    "investment_breakdown": ("sip", "fixed_deposit_one", "fixed_deposit_two", "etf"),
+}
+
+# Calendar month names as stored in the month columns
+MONTH_ORDER = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+MONTH_INDEX = {month: i for i, month in enumerate(MONTH_ORDER)}
+MONTH_SHORT = tuple(month[:3] for month in MONTH_ORDER)
+
+# (expires_at, month name, year) for current_month_year
+_month_cache = (0.0, "", 0)
+
+
+def current_month_year():
+    # Month name and year for "now", refreshed at most every 30 seconds. The tuple
+    # is replaced whole and read once, so threads never see a mixed pair.
+    global _month_cache
+    cached = _month_cache
+    ts = time.time()
+    if ts >= cached[0]:
+        now = datetime.now()
+        cached = (ts + 30, MONTH_ORDER[now.month - 1], now.year)
+        _month_cache = cached
+    return cached[1], cached[2]
+
+
+# Budget entry column each variable budget category is finalized into
+CATEGORY_ATTR = {
+    "food": "food",
+    "travel": "travel",
+    "shopping": "shopping",
+    "other": "other_expenses",
+}
+
+
+def as_form(cls):
+    """Let a Pydantic model be used as Depends(Model.as_form) for form posts"""
+    params = [
+        inspect.Parameter(
+            name,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=Form(field.default),
+            annotation=field.annotation,
+        )
+        for name, field in cls.model_fields.items()
+    ]
+
+    def _as_form(**data):
+        return cls(**data)
+
+    _as_form.__signature__ = inspect.Signature(params)
+    cls.as_form = staticmethod(_as_form)
+    return cls
+
+
+@as_form
+class BudgetForm(BaseModel):
+    # Income
+    salary: float = 0.0
+    freelancing_one: float = 0.0
+    freelancing_two: float = 0.0
+
+    # Expenses
+    mobile_recharge: float = 0.0
+    wifi: float = 0.0
+    emi_one: float = 0.0
+    emi_two: float = 0.0
+    emi_three: float = 0.0
+    emi_four: float = 0.0
+    food: float = 0.0
+    rent: float = 0.0
+    creditcard_one: float = 0.0
+    creditcard_two: float = 0.0
+    shopping: float = 0.0
+    travel: float = 0.0
+    other_expenses: float = 0.0
+
+    # Savings/Investments
+    sip: float = 0.0
+    fixed_deposit_one: float = 0.0
+    fixed_deposit_two: float = 0.0
+    etf: float = 0.0
 
 
 class VariableBudgetEntry(Base):
     __tablename__ = "variable_budget_entries"
+    __table_args__ = (
+        # Covers the month listing and the finalize path's is_finalized filter
+        Index(
+            "ix_variable_budget_user_year_month_finalized",
+            "user_id",
+            "year",
+            "month",
+            "is_finalized",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer)
@@ -112,16 +397,21 @@ class VariableBudgetEntry(Base):
     category = Column(String)  # "food", "travel", "shopping", "other"
     description = Column(String, default="")
     amount = Column(Float, default=0.0)
-    date_added = Column(DateTime, default=datetime.now)
+    date_added = Column(DateTime, default=func.now(), server_default=func.now())
     is_finalized = Column(
         Integer, default=0
     )  # 0 = draft, 1 = finalized to monthly budget
-    created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(
+        DateTime, default=func.now(), server_default=func.now(), onupdate=func.now()
+    )
 
 
 class BucketList(Base):
     __tablename__ = "bucket_list"
+    __table_args__ = (
+        Index("ix_bucket_list_user_completed", "user_id", "is_completed"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer)
@@ -132,23 +422,152 @@ class BucketList(Base):
     priority = Column(String, default="Medium")  # "High", "Medium", "Low"
     target_date = Column(String, default="")  # Target month/year to buy
     is_completed = Column(Integer, default=0)  # 0 = pending, 1 = completed
-    created_at = Column(DateTime, default=datetime.now)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
     completed_at = Column(DateTime, default=None)
 
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+def add_missing_columns():
+    # Existing databases predate some columns; add them with their DDL as declared
+    existing = inspect_db(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not existing.has_table(table.name):
+                continue
+            present = {column["name"] for column in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+def duplicate_budget_entries(conn):
+    # Older databases allowed several entries per user and month; these are the
+    # rows, all but the newest of each, that keep uq_budget_user_year_month out
+    newest = select(func.max(BudgetEntry.id)).group_by(
+        BudgetEntry.user_id, BudgetEntry.year, BudgetEntry.month
+    )
+    return conn.execute(
+        select(
+            BudgetEntry.id,
+            BudgetEntry.user_id,
+            BudgetEntry.year,
+            BudgetEntry.month,
+            BudgetEntry.salary,
+            BudgetEntry.created_at,
+        )
+        .where(BudgetEntry.id.not_in(newest))
+        .order_by(BudgetEntry.user_id, BudgetEntry.year, BudgetEntry.month)
+    ).all()
+
+
+def budget_index_blocked():
+    """True when duplicates would make the unique budget index fail to build"""
+    existing = inspect_db(engine)
+    if not existing.has_table(BudgetEntry.__tablename__):
+        return False
+    index_names = {
+        index["name"] for index in existing.get_indexes(BudgetEntry.__tablename__)
+    }
+    if "uq_budget_user_year_month" in index_names:
+        return False
+    with engine.connect() as conn:
+        duplicates = duplicate_budget_entries(conn)
+    if duplicates:
+        logger.error(
+            f"{len(duplicates)} duplicate budget entries block "
+            "uq_budget_user_year_month; review and remove them with "
+            "`python -m init_db --dedupe-budget-entries`"
+        )
+    return bool(duplicates)
+
+
+def dedupe_budget_entries():
+    """Delete all but the newest budget entry per user and month; returns them"""
+    if not inspect_db(engine).has_table(BudgetEntry.__tablename__):
+        return []
+    with engine.begin() as conn:
+        duplicates = duplicate_budget_entries(conn)
+        if duplicates:
+            conn.execute(
+                delete(BudgetEntry).where(
+                    BudgetEntry.id.in_([row.id for row in duplicates])
+                )
+            )
+    return duplicates
+
+
+def upsert_insert(model):
+    # INSERT that supports on_conflict_do_update/do_nothing on this database
+    if engine.dialect.name == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
 
 
 # Lifespan event handler
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    # Sync routes run in AnyIO's threadpool; don't start more DB work than the
+    # pool can hand connections to. SQLite gets QueuePool's default overflow of
+    # 10. NullPool (PgBouncer), pool_size=0 and a negative overflow are unbounded.
+    max_overflow = 10 if engine.dialect.name == "sqlite" else DB_MAX_OVERFLOW
+    if (
+        isinstance(engine.pool, QueuePool)
+        and engine.pool.size() > 0
+        and max_overflow >= 0
+    ):
+        to_thread.current_default_thread_limiter().total_tokens = (
+            engine.pool.size() + max_overflow
+        )
+    # Create tables (done here rather than at import so init_db can own DDL)
+    Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add any new columns and indexes
+    add_missing_columns()
+    skip_unique_budget = budget_index_blocked()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if skip_unique_budget and index.name == "uq_budget_user_year_month":
+                continue
+            index.create(bind=engine, checkfirst=True)
+    # Compile every template up front and keep them for render()
+    for name in templates.env.list_templates():
+        template = templates.env.get_template(name)
+        if not templates.env.auto_reload:
+            TEMPLATES[name] = template
     db = SessionLocal()
     init_users(db)
+    # Drop refresh tokens that can no longer be used (expires_at is naive UTC)
+    db.execute(
+        delete(RefreshToken).where(
+            RefreshToken.expires_at < datetime.now(timezone.utc).replace(tzinfo=None)
+        )
+    )
+    db.commit()
     db.close()
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    if _excel_pool is not None:
+        _excel_pool.shutdown()
+
+
+class TextGZipMiddleware:
+    """GZipMiddleware for everything but the Excel, Parquet and Feather downloads
+
+    Those are already compressed containers; gzipping them again only burns CPU
+    and drops their Content-Length.
+    """
+
+    def __init__(self, app, **options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/download/"):
+            query = parse_qs(scope["query_string"].decode("latin-1"))
+            if query.get("format", ["csv"])[-1].lower() != ExportFormat.csv:
+                await self.app(scope, receive, send)
+                return
+        await self.gzip(scope, receive, send)
 
 
 # FastAPI app
@@ -157,10 +576,27 @@ app = FastAPI(
     description="Personal Budget Planning Application",
     lifespan=lifespan,
 )
+# Compress for clients that send Accept-Encoding: gzip; level 1 keeps streamed
+# CSV downloads cheap while still shrinking them several times over
+app.add_middleware(TextGZipMiddleware, minimum_size=1000, compresslevel=1)
 
 # Static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
+# Skip per-render mtime checks unless debugging, and keep compiled bytecode on disk
+templates.env.auto_reload = os.getenv("DEBUG") == "1"
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+
+# Compiled templates by name, filled at startup
+TEMPLATES = {}
+
+
+def render(name, **context):
+    # Render straight to HTML, skipping TemplateResponse's per-call lookups
+    template = TEMPLATES.get(name) or templates.env.get_template(name)
+    return HTMLResponse(template.render(**context))
 
 
 # Dependency
@@ -174,11 +610,72 @@ def get_db():
 
 # Password utilities
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(plain_password, hashed_password):
+    # Returns (verified, new_hash); new_hash is set when the stored hash is outdated
+    if hashed_password.startswith("$2"):
+        # Legacy bcrypt hash, e.g. seeded by init_db
+        try:
+            verified = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+        except ValueError:
+            # bcrypt 5 rejects passwords over 72 bytes; so does a malformed hash
+            return False, None
+        if not verified:
+            return False, None
+        return True, get_password_hash(plain_password)
+
+    try:
+        password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHash):
+        return False, None
+    if password_hasher.check_needs_rehash(hashed_password):
+        return True, get_password_hash(plain_password)
+    return True, None
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+
+def _token_key(token: str):
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def _verify_access(token: str):
+    """Decode an access token, reusing a cached payload until it expires"""
+    key = _token_key(token)
+    now = time.time()
+    with _auth_cache_lock:
+        cached = _access_cache.get(key)
+    if cached and now < cached[1]:
+        return cached[0]
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    with _auth_cache_lock:
+        _access_cache[key] = (payload, min(payload["exp"], now + AUTH_CACHE_TTL))
+    return payload
+
+
+def _cache_user(db: Session, user):
+    # Detach so this session's commits can't expire the shared copy
+    if user:
+        db.expunge(user)
+        with _auth_cache_lock:
+            _user_cache[user.id] = user
+    return user
+
+
+def _cached_user(user_id):
+    with _auth_cache_lock:
+        return _user_cache.get(user_id)
+
+
+def _bump_chart_gen(user_id):
+    # Call after commit so a concurrent reader can't cache old rows under the new key
+    with _chart_cache_lock:
+        _chart_gen[user_id] = _chart_gen.get(user_id, 0) + 1
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -195,13 +692,29 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 
 def create_refresh_token(data: dict, db: Session):
+    user_id = data.get("user_id")
+    now = datetime.now(timezone.utc)
+
+    # Reuse a live refresh token instead of adding a row on every login
+    existing = (
+        db.query(RefreshToken.token)
+        .filter(
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == 0,
+            RefreshToken.expires_at > now.replace(tzinfo=None),
+        )
+        .order_by(RefreshToken.expires_at.desc())
+        .first()
+    )
+    if existing:
+        return existing.token
+
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
     # Store refresh token in database
-    user_id = data.get("user_id")
     refresh_token = RefreshToken(
         user_id=user_id, token=encoded_jwt, expires_at=expire.replace(tzinfo=None)
     )
@@ -212,8 +725,15 @@ def create_refresh_token(data: dict, db: Session):
 
 
 def verify_refresh_token(token: str, db: Session):
-    try:
-        payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+    key = _token_key(token)
+    with _auth_cache_lock:
+        user_id = _refresh_cache.get(key)
+
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
         if payload.get("type") != "refresh":
             return None
 
@@ -228,24 +748,53 @@ def verify_refresh_token(token: str, db: Session):
             return None
 
         user_id = payload.get("user_id")
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
-    except JWTError:
-        return None
+        with _auth_cache_lock:
+            _refresh_cache[key] = user_id
+
+    user = _cached_user(user_id)
+    if user is None:
+        user = _cache_user(db, db.get(User, user_id))
+    return user
 
 
 def get_current_user(request: Request, db: Session = Depends(get_db)):
+    # Resolve at most once per request, however many times a route asks
+    try:
+        return request.state.user
+    except AttributeError:
+        pass
+    user = _resolve_current_user(request, db)
+    request.state.user = user
+    return user
+
+
+def require_user(current_user: User = Depends(get_current_user)):
+    # For endpoints that have no login page to redirect to
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return current_user
+
+
+def _resolve_current_user(request: Request, db: Session):
     access_token = request.cookies.get("access_token")
     refresh_token = request.cookies.get("refresh_token")
 
     if access_token:
         try:
-            payload = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = _verify_access(access_token)
             if payload.get("type") == "access":
+                user_id = payload.get("user_id")
                 username: str = payload.get("sub")
+                if user_id is not None:
+                    # Primary-key lookup goes through the identity map first
+                    user = _cached_user(user_id)
+                    if user is None:
+                        user = _cache_user(db, db.get(User, user_id))
+                    return user
                 if username:
+                    # Older tokens carry only the username
                     user = db.query(User).filter(User.username == username).first()
-                    return user
+                    return _cache_user(db, user)
         except JWTError:
             pass
 
@@ -273,68 +822,67 @@ def init_users(db: Session):
         {"username": "babu", "password": "babu7474"},
     ]
 
-    for user_data in users_data:
-        existing_user = (
-            db.query(User).filter(User.username == user_data["username"]).first()
+    # One lookup for all seed users; only hash the ones that are missing
+    existing = {
+        username
+        for (username,) in db.query(User.username).filter(
+            User.username.in_([u["username"] for u in users_data])
         )
-        if not existing_user:
-            hashed_password = get_password_hash(user_data["password"])
-            user = User(username=user_data["username"], hashed_password=hashed_password)
-            db.add(user)
-
-    db.commit()
+    }
+    new_users = [
+        User(username=u["username"], hashed_password=get_password_hash(u["password"]))
+        for u in users_data
+        if u["username"] not in existing
+    ]
+    if new_users:
+        db.bulk_save_objects(new_users)
+        db.commit()
 
 
 # Routes
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, db: Session = Depends(get_db)):
+def home(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
-    # Get latest budget entry
-    latest_entry = (
+    # Get all entries for charts, newest first so the latest is the head
+    all_entries = (
         db.query(BudgetEntry)
         .filter(BudgetEntry.user_id == current_user.id)
         .order_by(BudgetEntry.created_at.desc())
-        .first()
-    )
-
-    # Get all entries for charts
-    all_entries = (
-        db.query(BudgetEntry).filter(BudgetEntry.user_id == current_user.id).all()
+        .all()
     )
+    latest_entry = all_entries[0] if all_entries else None
 
-    # Get bucket list stats
-    total_bucket_items = (
-        db.query(BucketList).filter(BucketList.user_id == current_user.id).count()
-    )
-    completed_bucket_items = (
-        db.query(BucketList)
-        .filter(BucketList.user_id == current_user.id, BucketList.is_completed == 1)
-        .count()
+    # Get bucket list stats in one aggregate
+    total_bucket_items, completed_bucket_items = (
+        db.query(
+            func.count(BucketList.id),
+            func.coalesce(func.sum(BucketList.is_completed), 0),
+        )
+        .filter(BucketList.user_id == current_user.id)
+        .one()
     )
 
-    return templates.TemplateResponse(
+    return render(
         "dashboard.html",
-        {
-            "request": request,
-            "user": current_user,
-            "latest_entry": latest_entry,
-            "all_entries": all_entries,
-            "total_bucket_items": total_bucket_items,
-            "completed_bucket_items": completed_bucket_items,
-        },
+        request=request,
+        user=current_user,
+        latest_entry=latest_entry,
+        all_entries=all_entries,
+        total_bucket_items=total_bucket_items,
+        completed_bucket_items=completed_bucket_items,
     )
 
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return render("login.html", request=request)
 
 
 @app.post("/login")
-async def login(
+def login(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
@@ -342,11 +890,21 @@ async def login(
 ):
     user = db.query(User).filter(User.username == username).first()
 
-    if not user or not verify_password(password, user.hashed_password):
-        return templates.TemplateResponse(
-            "login.html", {"request": request, "error": "Invalid username or password"}
+    verified, new_hash = (
+        verify_and_update_password(password, user.hashed_password)
+        if user
+        else (False, None)
+    )
+    if not verified:
+        return render(
+            "login.html", request=request, error="Invalid username or password"
         )
 
+    # Rehash legacy bcrypt passwords with the current scheme
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -387,9 +945,15 @@ async def login(
 
 
 @app.get("/logout")
-async def logout(request: Request, db: Session = Depends(get_db)):
+def logout(request: Request, db: Session = Depends(get_db)):
     # Revoke refresh token if exists
     refresh_token = request.cookies.get("refresh_token")
+    access_token = request.cookies.get("access_token")
+    with _auth_cache_lock:
+        if refresh_token:
+            _refresh_cache.pop(_token_key(refresh_token), None)
+        if access_token:
+            _access_cache.pop(_token_key(access_token), None)
     if refresh_token:
         db_token = (
             db.query(RefreshToken).filter(RefreshToken.token == refresh_token).first()
@@ -405,7 +969,7 @@ async def logout(request: Request, db: Session = Depends(get_db)):
 
 
 @app.get("/budget", response_class=HTMLResponse)
-async def budget_page(request: Request, db: Session = Depends(get_db)):
+def budget_page(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
@@ -418,34 +982,13 @@ async def budget_page(request: Request, db: Session = Depends(get_db)):
         .all()
     )
 
-    return templates.TemplateResponse(
-        "budget.html", {"request": request, "user": current_user, "entries": entries}
-    )
+    return render("budget.html", request=request, user=current_user, entries=entries)
 
 
 @app.post("/budget")
-async def save_budget(
+def save_budget(
     request: Request,
-    salary: float = Form(0.0),
-    freelancing_one: float = Form(0.0),
-    freelancing_two: float = Form(0.0),
-    mobile_recharge: float = Form(0.0),
-    wifi: float = Form(0.0),
-    emi_one: float = Form(0.0),
-    emi_two: float = Form(0.0),
-    emi_three: float = Form(0.0),
-    emi_four: float = Form(0.0),
-    food: float = Form(0.0),
-    rent: float = Form(0.0),
-    creditcard_one: float = Form(0.0),
-    creditcard_two: float = Form(0.0),
-    shopping: float = Form(0.0),
-    travel: float = Form(0.0),
-    other_expenses: float = Form(0.0),
-    sip: float = Form(0.0),
-    fixed_deposit_one: float = Form(0.0),
-    fixed_deposit_two: float = Form(0.0),
-    etf: float = Form(0.0),
+    form: BudgetForm = Depends(BudgetForm.as_form),
     confirm_overwrite: str = Form(""),
     db: Session = Depends(get_db),
 ):
@@ -453,134 +996,85 @@ async def save_budget(
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
+    fields = form.model_dump()
+
     # Use current month and year automatically
-    now = datetime.now()
-    current_month = now.strftime("%B")
-    current_year = now.year
+    current_month, current_year = current_month_year()
 
-    # Check if entry exists for this month/year
-    existing_entry = (
-        db.query(BudgetEntry)
-        .filter(
-            BudgetEntry.user_id == current_user.id,
-            BudgetEntry.month == current_month,
-            BudgetEntry.year == current_year,
-        )
-        .first()
+    this_month = (
+        BudgetEntry.user_id == current_user.id,
+        BudgetEntry.month == current_month,
+        BudgetEntry.year == current_year,
     )
 
-    if existing_entry and confirm_overwrite != "yes":
-        # Return to budget page with warning if entry exists and no confirmation
-        entries = (
-            db.query(BudgetEntry)
-            .filter(BudgetEntry.user_id == current_user.id)
-            .order_by(BudgetEntry.year.desc(), BudgetEntry.month.desc())
-            .all()
-        )
-        return templates.TemplateResponse(
-            "budget.html",
-            {
-                "request": request,
-                "user": current_user,
-                "entries": entries,
-                "existing_entry": existing_entry,
-                "show_warning": True,
-                "form_data": {
-                    "salary": salary,
-                    "freelancing_one": freelancing_one,
-                    "freelancing_two": freelancing_two,
-                    "mobile_recharge": mobile_recharge,
-                    "wifi": wifi,
-                    "emi_one": emi_one,
-                    "emi_two": emi_two,
-                    "emi_three": emi_three,
-                    "emi_four": emi_four,
-                    "food": food,
-                    "rent": rent,
-                    "creditcard_one": creditcard_one,
-                    "creditcard_two": creditcard_two,
-                    "shopping": shopping,
-                    "travel": travel,
-                    "other_expenses": other_expenses,
-                    "sip": sip,
-                    "fixed_deposit_one": fixed_deposit_one,
-                    "fixed_deposit_two": fixed_deposit_two,
-                    "etf": etf,
-                },
-            },
-        )
+    new_entry = upsert_insert(BudgetEntry).values(
+        user_id=current_user.id,
+        month=current_month,
+        year=current_year,
+        **fields,
+    )
+    index_elements = ["user_id", "year", "month"]
 
-    if existing_entry:
-        # Update existing entry only if confirmed
-        existing_entry.salary = salary
-        existing_entry.freelancing_one = freelancing_one
-        existing_entry.freelancing_two = freelancing_two
-        existing_entry.mobile_recharge = mobile_recharge
-        existing_entry.wifi = wifi
-        existing_entry.emi_one = emi_one
-        existing_entry.emi_two = emi_two
-        existing_entry.emi_three = emi_three
-        existing_entry.emi_four = emi_four
-        existing_entry.food = food
-        existing_entry.rent = rent
-        existing_entry.creditcard_one = creditcard_one
-        existing_entry.creditcard_two = creditcard_two
-        existing_entry.shopping = shopping
-        existing_entry.travel = travel
-        existing_entry.other_expenses = other_expenses
-        existing_entry.sip = sip
-        existing_entry.fixed_deposit_one = fixed_deposit_one
-        existing_entry.fixed_deposit_two = fixed_deposit_two
-        existing_entry.etf = etf
-    else:
-        # Create new entry
-        budget_entry = BudgetEntry(
-            user_id=current_user.id,
-            month=current_month,
-            year=current_year,
-            salary=salary,
-            freelancing_one=freelancing_one,
-            freelancing_two=freelancing_two,
-            mobile_recharge=mobile_recharge,
-            wifi=wifi,
-            emi_one=emi_one,
-            emi_two=emi_two,
-            emi_three=emi_three,
-            emi_four=emi_four,
-            food=food,
-            rent=rent,
-            creditcard_one=creditcard_one,
-            creditcard_two=creditcard_two,
-            shopping=shopping,
-            travel=travel,
-            other_expenses=other_expenses,
-            sip=sip,
-            fixed_deposit_one=fixed_deposit_one,
-            fixed_deposit_two=fixed_deposit_two,
-            etf=etf,
+    if confirm_overwrite == "yes":
+        # Overwrite this month's entry, or create it, in one race-free statement
+        db.execute(
+            new_entry.on_conflict_do_update(index_elements=index_elements, set_=fields)
         )
-        db.add(budget_entry)
+    else:
+        # Existence probe only; the warning needs just the id, month and year
+        existing_id = db.query(BudgetEntry.id).filter(*this_month).limit(1).scalar()
+        if existing_id is not None:
+            # Return to budget page with warning if entry exists and no confirmation
+            entries = (
+                db.query(BudgetEntry)
+                .options(
+                    load_only(
+                        BudgetEntry.id,
+                        BudgetEntry.month,
+                        BudgetEntry.year,
+                        BudgetEntry.created_at,
+                        *(
+                            getattr(BudgetEntry, field)
+                            for field in CHART_FIELDS["income"]
+                            + CHART_FIELDS["expenses"]
+                        ),
+                    )
+                )
+                .filter(BudgetEntry.user_id == current_user.id)
+                .order_by(BudgetEntry.year.desc(), BudgetEntry.month.desc())
+                .all()
+            )
+            return render(
+                "budget.html",
+                request=request,
+                user=current_user,
+                entries=entries,
+                existing_entry={
+                    "id": existing_id,
+                    "month": current_month,
+                    "year": current_year,
+                },
+                show_warning=True,
+                form_data=fields,
+            )
+        # Create new entry; if a concurrent save created it first, keep that one
+        db.execute(new_entry.on_conflict_do_nothing(index_elements=index_elements))
 
     db.commit()
+    _bump_chart_gen(current_user.id)
     return RedirectResponse("/budget", status_code=302)
 
 
 @app.get("/budget/edit/{entry_id}")
-async def edit_budget_page(
-    entry_id: int, request: Request, db: Session = Depends(get_db)
-):
+def edit_budget_page(entry_id: int, request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
     # Get the specific entry
-    entry = (
-        db.query(BudgetEntry)
-        .filter(BudgetEntry.id == entry_id, BudgetEntry.user_id == current_user.id)
-        .first()
-    )
+    entry = db.get(BudgetEntry, entry_id)
 
-    if not entry:
+    if not entry or entry.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Budget entry not found")
 
     # Get all entries for the sidebar
@@ -591,254 +1085,182 @@ async def edit_budget_page(
         .all()
     )
 
-    return templates.TemplateResponse(
+    return render(
         "budget_edit.html",
-        {"request": request, "user": current_user, "entry": entry, "entries": entries},
+        request=request,
+        user=current_user,
+        entry=entry,
+        entries=entries,
     )
 
 
 @app.post("/budget/update/{entry_id}")
-async def update_budget(
+def update_budget(
     entry_id: int,
     request: Request,
-    salary: float = Form(0.0),
-    freelancing_one: float = Form(0.0),
-    freelancing_two: float = Form(0.0),
-    mobile_recharge: float = Form(0.0),
-    wifi: float = Form(0.0),
-    emi_one: float = Form(0.0),
-    emi_two: float = Form(0.0),
-    emi_three: float = Form(0.0),
-    emi_four: float = Form(0.0),
-    food: float = Form(0.0),
-    rent: float = Form(0.0),
-    creditcard_one: float = Form(0.0),
-    creditcard_two: float = Form(0.0),
-    shopping: float = Form(0.0),
-    travel: float = Form(0.0),
-    other_expenses: float = Form(0.0),
-    sip: float = Form(0.0),
-    fixed_deposit_one: float = Form(0.0),
-    fixed_deposit_two: float = Form(0.0),
-    etf: float = Form(0.0),
+    form: BudgetForm = Depends(BudgetForm.as_form),
     db: Session = Depends(get_db),
 ):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
-    # Get the entry to update
-    entry = (
-        db.query(BudgetEntry)
-        .filter(BudgetEntry.id == entry_id, BudgetEntry.user_id == current_user.id)
-        .first()
+    fields = form.model_dump()
+
+    # Single UPDATE scoped to the owner; no row means it isn't theirs or is gone
+    result = db.execute(
+        update(BudgetEntry)
+        .where(BudgetEntry.id == entry_id, BudgetEntry.user_id == current_user.id)
+        .values(**fields)
     )
 
-    if not entry:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Budget entry not found")
 
-    # Update the entry
-    entry.salary = salary
-    entry.freelancing_one = freelancing_one
-    entry.freelancing_two = freelancing_two
-    entry.mobile_recharge = mobile_recharge
-    entry.wifi = wifi
-    entry.emi_one = emi_one
-    entry.emi_two = emi_two
-    entry.emi_three = emi_three
-    entry.emi_four = emi_four
-    entry.food = food
-    entry.rent = rent
-    entry.creditcard_one = creditcard_one
-    entry.creditcard_two = creditcard_two
-    entry.shopping = shopping
-    entry.travel = travel
-    entry.other_expenses = other_expenses
-    entry.sip = sip
-    entry.fixed_deposit_one = fixed_deposit_one
-    entry.fixed_deposit_two = fixed_deposit_two
-    entry.etf = etf
-
     db.commit()
+    _bump_chart_gen(current_user.id)
     return RedirectResponse("/budget", status_code=302)
 
 
 @app.post("/budget/delete/{entry_id}")
-async def delete_budget(entry_id: int, request: Request, db: Session = Depends(get_db)):
+def delete_budget(entry_id: int, request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
     # Get the entry to delete
-    entry = (
-        db.query(BudgetEntry)
-        .filter(BudgetEntry.id == entry_id, BudgetEntry.user_id == current_user.id)
-        .first()
-    )
+    entry = db.get(BudgetEntry, entry_id)
 
-    if not entry:
+    if not entry or entry.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Budget entry not found")
 
     db.delete(entry)
     db.commit()
+    _bump_chart_gen(current_user.id)
     return RedirectResponse("/budget", status_code=302)
 
 
-@app.get("/api/chart-data")
-async def get_chart_data(
-    request: Request, timespan: str = "all", db: Session = Depends(get_db)
+@app.get("/api/chart-data", response_class=ORJSONResponse)
+def get_chart_data(
+    request: Request,
+    timespan: str = "all",
+    totals_only: bool = False,
+    db: Session = Depends(get_db),
 ):
     current_user = get_current_user(request, db)
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
+    with _chart_cache_lock:
+        cache_key = (
+            current_user.id,
+            timespan,
+            totals_only,
+            _chart_gen.get(current_user.id, 0),
+        )
+        body = _chart_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
     entries_query = db.query(BudgetEntry).filter(BudgetEntry.user_id == current_user.id)
 
     # Filter by timespan
     if timespan != "all":
-        current_date = datetime.now()
-        current_year = current_date.year
-        current_month = current_date.month
+        current_month_name, current_year = current_month_year()
+        current_month = MONTH_INDEX[current_month_name] + 1
 
         if timespan == "current_month":
             entries_query = entries_query.filter(
                 BudgetEntry.year == current_year,
-                BudgetEntry.month == current_date.strftime("%B"),
+                BudgetEntry.month == current_month_name,
             )
         elif timespan == "quarter":
             # Current quarter
-            quarter_start = ((current_month - 1) // 3) * 3 + 1
-            quarter_months = []
-            for i in range(3):
-                month_num = quarter_start + i
-                if month_num <= 12:
-                    quarter_months.append(
-                        datetime(current_year, month_num, 1).strftime("%B")
-                    )
+            quarter_start = ((current_month - 1) // 3) * 3
+            quarter_months = MONTH_ORDER[quarter_start : quarter_start + 3]
             entries_query = entries_query.filter(
                 BudgetEntry.year == current_year, BudgetEntry.month.in_(quarter_months)
             )
         elif timespan == "half_year":
             # Current half year
-            if current_month <= 6:
-                half_months = [
-                    datetime(current_year, i, 1).strftime("%B") for i in range(1, 7)
-                ]
-            else:
-                half_months = [
-                    datetime(current_year, i, 1).strftime("%B") for i in range(7, 13)
-                ]
+            half_months = MONTH_ORDER[:6] if current_month <= 6 else MONTH_ORDER[6:]
             entries_query = entries_query.filter(
                 BudgetEntry.year == current_year, BudgetEntry.month.in_(half_months)
             )
         elif timespan == "current_year":
             entries_query = entries_query.filter(BudgetEntry.year == current_year)
 
-    entries = entries_query.order_by(BudgetEntry.year, BudgetEntry.month).all()
-
-    chart_data = {
-        "months": [],
-        "income": {
-            "salary": [],
-            "freelancing_one": [],
-            "freelancing_two": [],
-            "total": [],
-        },
-        "expenses": {
-            "mobile_recharge": [],
-            "wifi": [],
-            "emi_one": [],
-            "emi_two": [],
-            "emi_three": [],
-            "emi_four": [],
-            "food": [],
-            "rent": [],
-            "creditcard_one": [],
-            "creditcard_two": [],
-            "shopping": [],
-            "travel": [],
-            "other_expenses": [],
-            "total": [],
-        },
-        "savings": {
-            "sip": [],
-            "fixed_deposit_one": [],
-            "fixed_deposit_two": [],
-            "etf": [],
-            "total": [],
-        },
-    }
+    if totals_only:
+        # Let the database add up each section per month
+        section_sums = [
+            func.sum(sum(getattr(BudgetEntry, field) for field in fields)).label(
+                section
+            )
+            for section, fields in CHART_FIELDS.items()
+        ]
+        rows = db.execute(
+            entries_query.with_entities(
+                BudgetEntry.month, BudgetEntry.year, *section_sums
+            )
+            .group_by(BudgetEntry.year, BudgetEntry.month)
+            .order_by(BudgetEntry.year, BudgetEntry.month)
+            .statement
+        ).fetchall()
+
+        chart_data = {"months": [f"{row.month} {row.year}" for row in rows]}
+        for section in CHART_FIELDS:
+            chart_data[section] = {"total": [row._mapping[section] for row in rows]}
+    else:
+        chart_data = _chart_series(db, entries_query)
 
-    for entry in entries:
-        month_year = f"{entry.month} {entry.year}"
-        chart_data["months"].append(month_year)
-
-        # Income data
-        chart_data["income"]["salary"].append(entry.salary)
-        chart_data["income"]["freelancing_one"].append(entry.freelancing_one)
-        chart_data["income"]["freelancing_two"].append(entry.freelancing_two)
-        total_income = entry.salary + entry.freelancing_one + entry.freelancing_two
-        chart_data["income"]["total"].append(total_income)
-
-        # Expense data
-        chart_data["expenses"]["mobile_recharge"].append(entry.mobile_recharge)
-        chart_data["expenses"]["wifi"].append(entry.wifi)
-        chart_data["expenses"]["emi_one"].append(entry.emi_one)
-        chart_data["expenses"]["emi_two"].append(entry.emi_two)
-        chart_data["expenses"]["emi_three"].append(entry.emi_three)
-        chart_data["expenses"]["emi_four"].append(entry.emi_four)
-        chart_data["expenses"]["food"].append(entry.food)
-        chart_data["expenses"]["rent"].append(entry.rent)
-        chart_data["expenses"]["creditcard_one"].append(entry.creditcard_one)
-        chart_data["expenses"]["creditcard_two"].append(entry.creditcard_two)
-        chart_data["expenses"]["shopping"].append(entry.shopping)
-        chart_data["expenses"]["travel"].append(entry.travel)
-        chart_data["expenses"]["other_expenses"].append(entry.other_expenses)
-
-        total_expenses = (
-            entry.mobile_recharge
-            + entry.wifi
-            + entry.emi_one
-            + entry.emi_two
-            + entry.emi_three
-            + entry.emi_four
-            + entry.food
-            + entry.rent
-            + entry.creditcard_one
-            + entry.creditcard_two
-            + entry.shopping
-            + entry.travel
-            + entry.other_expenses
-        )
-        chart_data["expenses"]["total"].append(total_expenses)
+    body = orjson.dumps(chart_data)
+    with _chart_cache_lock:
+        _chart_cache[cache_key] = body
+    return Response(content=body, media_type="application/json")
 
-        # Savings data
-        chart_data["savings"]["sip"].append(entry.sip)
-        chart_data["savings"]["fixed_deposit_one"].append(entry.fixed_deposit_one)
-        chart_data["savings"]["fixed_deposit_two"].append(entry.fixed_deposit_two)
-        chart_data["savings"]["etf"].append(entry.etf)
 
-        total_savings = (
-            entry.sip + entry.fixed_deposit_one + entry.fixed_deposit_two + entry.etf
-        )
-        chart_data["savings"]["total"].append(total_savings)
+def _chart_series(db, entries_query):
+    # Per-column series plus section totals for the given entries
+    columns = [
+        getattr(BudgetEntry, field)
+        for fields in CHART_FIELDS.values()
+        for field in fields
+    ]
+    rows = db.execute(
+        entries_query.with_entities(BudgetEntry.month, BudgetEntry.year, *columns)
+        .order_by(BudgetEntry.year, BudgetEntry.month)
+        .statement
+    ).fetchall()
+
+    chart_data = {"months": [f"{month} {year}" for month, year, *_ in rows]}
+
+    # Slice one column group per section and let NumPy do the per-row totals
+    arr = np.array(rows, dtype=object).reshape(len(rows), 2 + len(columns))
+    offset = 2
+    for section, fields in CHART_FIELDS.items():
+        values = arr[:, offset : offset + len(fields)].astype(float)
+        chart_data[section] = {
+            field: values[:, i].tolist() for i, field in enumerate(fields)
+        }
+        chart_data[section]["total"] = values.sum(axis=1).tolist()
+        offset += len(fields)
 
     return chart_data
 
 
 @app.get("/api-test", response_class=HTMLResponse)
 async def api_test_page(request: Request):
-    return templates.TemplateResponse("api_test.html", {"request": request})
+    return render("api_test.html", request=request)
 
 
 @app.get("/savings-dashboard", response_class=HTMLResponse)
-async def savings_dashboard(request: Request, db: Session = Depends(get_db)):
+def savings_dashboard(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
     # Get current month for display
-    current_month = datetime.now().strftime("%B %Y")
+    current_month = "%s %s" % current_month_year()
 
     # Check if user has any budget entries
     entries_count = (
@@ -858,71 +1280,85 @@ async def savings_dashboard(request: Request, db: Session = Depends(get_db)):
         .count()
     )
 
-    return templates.TemplateResponse(
+    return render(
         "savings_dashboard.html",
-        {
-            "request": request,
-            "user": current_user,
-            "current_month": current_month,
-            "entries_count": entries_count,
-            "savings_entries": savings_entries,
-        },
+        request=request,
+        user=current_user,
+        current_month=current_month,
+        entries_count=entries_count,
+        savings_entries=savings_entries,
     )
 
 
 # Variable Budget Routes
 @app.get("/variable-budget", response_class=HTMLResponse)
-async def variable_budget_page(request: Request, db: Session = Depends(get_db)):
+def variable_budget_page(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
     # Get current month and year
-    now = datetime.now()
-    current_month = now.strftime("%B")
-    current_year = now.year
+    current_month, current_year = current_month_year()
 
-    # Get all variable budget entries for current month
+    this_month = (
+        VariableBudgetEntry.user_id == current_user.id,
+        VariableBudgetEntry.month == current_month,
+        VariableBudgetEntry.year == current_year,
+    )
+
+    # Get variable budget entries for current month, only the columns shown
     variable_entries = (
         db.query(VariableBudgetEntry)
-        .filter(
-            VariableBudgetEntry.user_id == current_user.id,
-            VariableBudgetEntry.month == current_month,
-            VariableBudgetEntry.year == current_year,
+        .options(
+            load_only(
+                VariableBudgetEntry.id,
+                VariableBudgetEntry.category,
+                VariableBudgetEntry.description,
+                VariableBudgetEntry.amount,
+                VariableBudgetEntry.date_added,
+                VariableBudgetEntry.is_finalized,
+            )
         )
+        .filter(*this_month)
         .order_by(VariableBudgetEntry.created_at.desc())
         .all()
     )
 
     # Group entries by category
-    grouped_entries = {}
+    grouped_entries = defaultdict(list)
     for entry in variable_entries:
-        if entry.category not in grouped_entries:
-            grouped_entries[entry.category] = []
         grouped_entries[entry.category].append(entry)
 
-    # Calculate totals by category
-    category_totals = {}
-    for category, entries in grouped_entries.items():
-        category_totals[category] = sum(
-            entry.amount for entry in entries if not entry.is_finalized
+    # Sum unfinalized amounts per category in the database
+    totals = dict(
+        db.query(
+            VariableBudgetEntry.category,
+            func.sum(
+                case(
+                    (VariableBudgetEntry.is_finalized == 0, VariableBudgetEntry.amount),
+                    else_=0,
+                )
+            ),
         )
+        .filter(*this_month)
+        .group_by(VariableBudgetEntry.category)
+        .all()
+    )
+    category_totals = {category: totals[category] for category in grouped_entries}
 
-    return templates.TemplateResponse(
+    return render(
         "variable_budget.html",
-        {
-            "request": request,
-            "user": current_user,
-            "grouped_entries": grouped_entries,
-            "category_totals": category_totals,
-            "current_month": current_month,
-            "current_year": current_year,
-        },
+        request=request,
+        user=current_user,
+        grouped_entries=grouped_entries,
+        category_totals=category_totals,
+        current_month=current_month,
+        current_year=current_year,
     )
 
 
 @app.post("/variable-budget")
-async def add_variable_budget(
+def add_variable_budget(
     request: Request,
     category: str = Form(...),
     description: str = Form(...),
@@ -934,9 +1370,7 @@ async def add_variable_budget(
         return RedirectResponse("/login", status_code=302)
 
     # Get current month and year
-    now = datetime.now()
-    current_month = now.strftime("%B")
-    current_year = now.year
+    current_month, current_year = current_month_year()
 
     # Create new variable budget entry
     variable_entry = VariableBudgetEntry(
@@ -954,7 +1388,7 @@ async def add_variable_budget(
 
 
 @app.post("/variable-budget/update/{entry_id}")
-async def update_variable_budget(
+def update_variable_budget(
     entry_id: int,
     request: Request,
     description: str = Form(...),
@@ -966,17 +1400,9 @@ async def update_variable_budget(
         return RedirectResponse("/login", status_code=302)
 
     # Get the entry to update
-    entry = (
-        db.query(VariableBudgetEntry)
-        .filter(
-            VariableBudgetEntry.id == entry_id,
-            VariableBudgetEntry.user_id == current_user.id,
-            VariableBudgetEntry.is_finalized == 0,
-        )
-        .first()
-    )
+    entry = db.get(VariableBudgetEntry, entry_id)
 
-    if not entry:
+    if not entry or entry.user_id != current_user.id or entry.is_finalized:
         raise HTTPException(
             status_code=404,
             detail="Variable budget entry not found or already finalized",
@@ -985,14 +1411,13 @@ async def update_variable_budget(
     # Update the entry
     entry.description = description
     entry.amount = amount
-    entry.updated_at = datetime.now()
 
     db.commit()
     return RedirectResponse("/variable-budget", status_code=302)
 
 
 @app.post("/variable-budget/delete/{entry_id}")
-async def delete_variable_budget(
+def delete_variable_budget(
     entry_id: int, request: Request, db: Session = Depends(get_db)
 ):
     current_user = get_current_user(request, db)
@@ -1000,17 +1425,9 @@ async def delete_variable_budget(
         return RedirectResponse("/login", status_code=302)
 
     # Get the entry to delete
-    entry = (
-        db.query(VariableBudgetEntry)
-        .filter(
-            VariableBudgetEntry.id == entry_id,
-            VariableBudgetEntry.user_id == current_user.id,
-            VariableBudgetEntry.is_finalized == 0,
-        )
-        .first()
-    )
+    entry = db.get(VariableBudgetEntry, entry_id)
 
-    if not entry:
+    if not entry or entry.user_id != current_user.id or entry.is_finalized:
         raise HTTPException(
             status_code=404,
             detail="Variable budget entry not found or already finalized",
@@ -1022,80 +1439,66 @@ async def delete_variable_budget(
 
 
 @app.post("/variable-budget/finalize")
-async def finalize_variable_budget(request: Request, db: Session = Depends(get_db)):
+def finalize_variable_budget(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
     # Get current month and year
-    now = datetime.now()
-    current_month = now.strftime("%B")
-    current_year = now.year
+    current_month, current_year = current_month_year()
 
-    # Get all non-finalized variable entries for current month
-    variable_entries = (
-        db.query(VariableBudgetEntry)
-        .filter(
-            VariableBudgetEntry.user_id == current_user.id,
-            VariableBudgetEntry.month == current_month,
-            VariableBudgetEntry.year == current_year,
-            VariableBudgetEntry.is_finalized == 0,
-        )
+    pending = (
+        VariableBudgetEntry.user_id == current_user.id,
+        VariableBudgetEntry.month == current_month,
+        VariableBudgetEntry.year == current_year,
+        VariableBudgetEntry.is_finalized == 0,
+    )
+
+    # Totals by category for this month's non-finalized entries
+    category_totals = (
+        db.query(VariableBudgetEntry.category, func.sum(VariableBudgetEntry.amount))
+        .filter(*pending)
+        .group_by(VariableBudgetEntry.category)
         .all()
     )
 
-    if not variable_entries:
+    if not category_totals:
         return RedirectResponse("/variable-budget", status_code=302)
 
-    # Calculate totals by category
-    category_totals = {}
-    for entry in variable_entries:
-        if entry.category not in category_totals:
-            category_totals[entry.category] = 0
-        category_totals[entry.category] += entry.amount
-
-    # Get or create budget entry for current month
-    budget_entry = (
-        db.query(BudgetEntry)
-        .filter(
-            BudgetEntry.user_id == current_user.id,
-            BudgetEntry.month == current_month,
-            BudgetEntry.year == current_year,
-        )
-        .first()
+    # Add the amounts onto this month's budget entry, creating it if needed,
+    # in a single INSERT ... ON CONFLICT DO UPDATE
+    amounts = {
+        CATEGORY_ATTR[category]: total
+        for category, total in category_totals
+        if category in CATEGORY_ATTR
+    }
+    stmt = upsert_insert(BudgetEntry).values(
+        user_id=current_user.id, month=current_month, year=current_year, **amounts
     )
-
-    if not budget_entry:
-        # Create new budget entry if it doesn't exist
-        budget_entry = BudgetEntry(
-            user_id=current_user.id,
-            month=current_month,
-            year=current_year,
+    index_elements = ["user_id", "year", "month"]
+    if amounts:
+        columns = BudgetEntry.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={attr: columns[attr] + stmt.excluded[attr] for attr in amounts},
         )
-        db.add(budget_entry)
-
-    # Update budget entry with variable amounts
-    for category, total in category_totals.items():
-        if category == "food":
-            budget_entry.food += total
-        elif category == "travel":
-            budget_entry.travel += total
-        elif category == "shopping":
-            budget_entry.shopping += total
-        elif category == "other":
-            budget_entry.other_expenses += total
-
-    # Mark all variable entries as finalized
-    for entry in variable_entries:
-        entry.is_finalized = 1
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+    db.execute(stmt)
+
+    # Mark all variable entries as finalized in one statement
+    db.query(VariableBudgetEntry).filter(*pending).update(
+        {"is_finalized": 1}, synchronize_session=False
+    )
 
     db.commit()
+    _bump_chart_gen(current_user.id)
     return RedirectResponse("/budget", status_code=302)
 
 
 # Bucket List Routes
 @app.get("/bucket-list", response_class=HTMLResponse)
-async def bucket_list_page(request: Request, db: Session = Depends(get_db)):
+def bucket_list_page(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
@@ -1108,26 +1511,25 @@ async def bucket_list_page(request: Request, db: Session = Depends(get_db)):
         .all()
     )
 
-    return templates.TemplateResponse(
+    return render(
         "bucket_list.html",
-        {"request": request, "user": current_user, "bucket_items": bucket_items},
+        request=request,
+        user=current_user,
+        bucket_items=bucket_items,
     )
 
 
 @app.get("/bucket-list/add", response_class=HTMLResponse)
-async def bucket_add_page(request: Request, db: Session = Depends(get_db)):
+def bucket_add_page(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
-    return templates.TemplateResponse(
-        "bucket_add.html",
-        {"request": request, "user": current_user},
-    )
+    return render("bucket_add.html", request=request, user=current_user)
 
 
 @app.post("/bucket-list")
-async def add_bucket_item(
+def add_bucket_item(
     request: Request,
     name: str = Form(...),
     category: str = Form("General"),
@@ -1157,44 +1559,41 @@ async def add_bucket_item(
 
 
 @app.get("/bucket-list/edit/{item_id}")
-async def edit_bucket_item_page(
+def edit_bucket_item_page(
     item_id: int, request: Request, db: Session = Depends(get_db)
 ):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
-    # Get the specific item
-    item = (
-        db.query(BucketList)
-        .filter(BucketList.id == item_id, BucketList.user_id == current_user.id)
-        .first()
-    )
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Bucket list item not found")
-
-    # Get all items for the sidebar
+    # Get the most recent items for the sidebar
     bucket_items = (
         db.query(BucketList)
         .filter(BucketList.user_id == current_user.id)
         .order_by(BucketList.created_at.desc())
+        .limit(SIDEBAR_LIMIT)
         .all()
     )
 
-    return templates.TemplateResponse(
+    # The item being edited is usually among them; only older ones need a query
+    item = next((i for i in bucket_items if i.id == item_id), None)
+    if item is None:
+        item = db.get(BucketList, item_id)
+
+    if not item or item.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Bucket list item not found")
+
+    return render(
         "bucket_list_edit.html",
-        {
-            "request": request,
-            "user": current_user,
-            "item": item,
-            "bucket_items": bucket_items,
-        },
+        request=request,
+        user=current_user,
+        item=item,
+        bucket_items=bucket_items,
     )
 
 
 @app.post("/bucket-list/update/{item_id}")
-async def update_bucket_item(
+def update_bucket_item(
     item_id: int,
     request: Request,
     name: str = Form(...),
@@ -1210,13 +1609,9 @@ async def update_bucket_item(
         return RedirectResponse("/login", status_code=302)
 
     # Get the item to update
-    item = (
-        db.query(BucketList)
-        .filter(BucketList.id == item_id, BucketList.user_id == current_user.id)
-        .first()
-    )
+    item = db.get(BucketList, item_id)
 
-    if not item:
+    if not item or item.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Bucket list item not found")
 
     # Update the item
@@ -1232,45 +1627,33 @@ async def update_bucket_item(
 
 
 @app.post("/bucket-list/complete/{item_id}")
-async def complete_bucket_item(
-    item_id: int, request: Request, db: Session = Depends(get_db)
-):
+def complete_bucket_item(item_id: int, request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
     # Get the item to complete
-    item = (
-        db.query(BucketList)
-        .filter(BucketList.id == item_id, BucketList.user_id == current_user.id)
-        .first()
-    )
+    item = db.get(BucketList, item_id)
 
-    if not item:
+    if not item or item.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Bucket list item not found")
 
     item.is_completed = 1
-    item.completed_at = datetime.now()
+    item.completed_at = func.now()
     db.commit()
     return RedirectResponse("/bucket-list", status_code=302)
 
 
 @app.post("/bucket-list/delete/{item_id}")
-async def delete_bucket_item(
-    item_id: int, request: Request, db: Session = Depends(get_db)
-):
+def delete_bucket_item(item_id: int, request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
 
     # Get the item to delete
-    item = (
-        db.query(BucketList)
-        .filter(BucketList.id == item_id, BucketList.user_id == current_user.id)
-        .first()
-    )
+    item = db.get(BucketList, item_id)
 
-    if not item:
+    if not item or item.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Bucket list item not found")
 
     db.delete(item)
@@ -1280,7 +1663,7 @@ async def delete_bucket_item(
 
 # Yearly Financial Charts Routes
 @app.get("/yearly-charts", response_class=HTMLResponse)
-async def yearly_charts(request: Request, db: Session = Depends(get_db)):
+def yearly_charts(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
@@ -1297,180 +1680,83 @@ async def yearly_charts(request: Request, db: Session = Depends(get_db)):
 
     # Default to current year if no data exists
     if not available_years:
-        available_years = [datetime.now().year]
+        available_years = [current_month_year()[1]]
 
-    return templates.TemplateResponse(
+    return render(
         "yearly_charts.html",
-        {
-            "request": request,
-            "user": current_user,
-            "available_years": available_years,
-        },
+        request=request,
+        user=current_user,
+        available_years=available_years,
     )
 
 
-@app.get("/api/yearly-chart-data/{year}")
-async def get_yearly_chart_data(
-    year: int, request: Request, db: Session = Depends(get_db)
-):
+@app.get("/api/yearly-chart-data/{year}", response_class=ORJSONResponse)
+def get_yearly_chart_data(year: int, request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    # Get all entries for the specified year
-    entries = (
-        db.query(BudgetEntry)
-        .filter(BudgetEntry.user_id == current_user.id, BudgetEntry.year == year)
-        .order_by(BudgetEntry.month)
-        .all()
-    )
-
-    # Month order for proper sorting
-    month_order = [
-        "January",
-        "February",
-        "March",
-        "April",
-        "May",
-        "June",
-        "July",
-        "August",
-        "September",
-        "October",
-        "November",
-        "December",
+    with _chart_cache_lock:
+        cache_key = (current_user.id, year, _chart_gen.get(current_user.id, 0))
+        body = _yearly_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
+    # Pull only the charted columns as plain rows
+    fields = [f for fs in YEARLY_BREAKDOWNS.values() for f in fs] + [
+        "total_income",
+        "total_expenses",
+        "total_investments",
     ]
+    rows = db.execute(
+        select(BudgetEntry.month, *(getattr(BudgetEntry, f) for f in fields)).where(
+            BudgetEntry.user_id == current_user.id, BudgetEntry.year == year
+        )
+    ).all()
+
+    # One row per calendar month, in calendar order, as a months x fields matrix
+    by_month = [None] * 12
+    for row in rows:
+        i = MONTH_INDEX.get(row[0])
+        if i is not None:
+            by_month[i] = row[1:]
+    present = [i for i, values in enumerate(by_month) if values is not None]
+    months = [MONTH_ORDER[i] for i in present]
+    values = np.array([by_month[i] for i in present], dtype=float).reshape(
+        len(present), len(fields)
+    )
+    columns = dict(zip(fields, values.T))
+
+    # Totals are computed columns (investments are only SIP, FD, ETF);
+    # the remaining budget balance (not savings) is one vector op
+    income = columns["total_income"].tolist()
+    expenses = columns["total_expenses"].tolist()
+    investments = columns["total_investments"].tolist()
+    budget_balance = (
+        columns["total_income"]
+        - columns["total_expenses"]
+        - columns["total_investments"]
+    ).tolist()
 
-    # Initialize data structure
     yearly_data = {
         "year": year,
-        "months": [],
+        "months": months,
         "monthly_totals": {
-            "income": [],
-            "expenses": [],
-            "investments": [],
-            "budget_balance": [],
-        },
-        "income_breakdown": {
-            "salary": [],
-            "freelancing_one": [],
-            "freelancing_two": [],
-        },
-        "expense_breakdown": {
-            "mobile_recharge": [],
-            "wifi": [],
-            "emi_total": [],
-            "food": [],
-            "rent": [],
-            "creditcard_total": [],
-            "shopping": [],
-            "travel": [],
-            "other_expenses": [],
-        },
-        "investment_breakdown": {
-            "sip": [],
-            "fixed_deposit_one": [],
-            "fixed_deposit_two": [],
-            "etf": [],
-        },
-        "monthly_comparison": {
-            "months": [],
-            "income": [],
-            "expenses": [],
-            "investments": [],
-            "budget_balance": [],
+            "income": income,
+            "expenses": expenses,
+            "investments": investments,
+            "budget_balance": budget_balance,
         },
     }
-
-    # Create a dictionary for quick lookup
-    entries_by_month = {entry.month: entry for entry in entries}
-
-    # Process data for each month
-    for month in month_order:
-        entry = entries_by_month.get(month)
-
-        if entry:
-            yearly_data["months"].append(month)
-
-            # Calculate totals
-            total_income = entry.salary + entry.freelancing_one + entry.freelancing_two
-            total_expenses = (
-                entry.mobile_recharge
-                + entry.wifi
-                + entry.emi_one
-                + entry.emi_two
-                + entry.emi_three
-                + entry.emi_four
-                + entry.food
-                + entry.rent
-                + entry.creditcard_one
-                + entry.creditcard_two
-                + entry.shopping
-                + entry.travel
-                + entry.other_expenses
-            )
-            # Calculate actual investments/savings (only SIP, FD, ETF)
-            total_investments = (
-                entry.sip
-                + entry.fixed_deposit_one
-                + entry.fixed_deposit_two
-                + entry.etf
-            )
-            # Calculate remaining budget balance (not savings)
-            budget_balance = total_income - total_expenses - total_investments
-
-            # Monthly totals
-            yearly_data["monthly_totals"]["income"].append(total_income)
-            yearly_data["monthly_totals"]["expenses"].append(total_expenses)
-            yearly_data["monthly_totals"]["investments"].append(total_investments)
-            yearly_data["monthly_totals"]["budget_balance"].append(budget_balance)
-
-            # Income breakdown
-            yearly_data["income_breakdown"]["salary"].append(entry.salary)
-            yearly_data["income_breakdown"]["freelancing_one"].append(
-                entry.freelancing_one
-            )
-            yearly_data["income_breakdown"]["freelancing_two"].append(
-                entry.freelancing_two
-            )
-
-            # Expense breakdown
-            yearly_data["expense_breakdown"]["mobile_recharge"].append(
-                entry.mobile_recharge
-            )
-            yearly_data["expense_breakdown"]["wifi"].append(entry.wifi)
-            yearly_data["expense_breakdown"]["emi_total"].append(
-                entry.emi_one + entry.emi_two + entry.emi_three + entry.emi_four
-            )
-            yearly_data["expense_breakdown"]["food"].append(entry.food)
-            yearly_data["expense_breakdown"]["rent"].append(entry.rent)
-            yearly_data["expense_breakdown"]["creditcard_total"].append(
-                entry.creditcard_one + entry.creditcard_two
-            )
-            yearly_data["expense_breakdown"]["shopping"].append(entry.shopping)
-            yearly_data["expense_breakdown"]["travel"].append(entry.travel)
-            yearly_data["expense_breakdown"]["other_expenses"].append(
-                entry.other_expenses
-            )
-
-            # Investment breakdown
-            yearly_data["investment_breakdown"]["sip"].append(entry.sip)
-            yearly_data["investment_breakdown"]["fixed_deposit_one"].append(
-                entry.fixed_deposit_one
-            )
-            yearly_data["investment_breakdown"]["fixed_deposit_two"].append(
-                entry.fixed_deposit_two
-            )
-            yearly_data["investment_breakdown"]["etf"].append(entry.etf)
-
-            # Monthly comparison data
-            yearly_data["monthly_comparison"]["months"].append(
-                month[:3]
-            )  # Short month name
-            yearly_data["monthly_comparison"]["income"].append(total_income)
-            yearly_data["monthly_comparison"]["expenses"].append(total_expenses)
-            yearly_data["monthly_comparison"]["investments"].append(total_investments)
-            yearly_data["monthly_comparison"]["budget_balance"].append(budget_balance)
+    for section, section_fields in YEARLY_BREAKDOWNS.items():
+        yearly_data[section] = {f: columns[f].tolist() for f in section_fields}
+    yearly_data["monthly_comparison"] = {
+        "months": [MONTH_SHORT[i] for i in present],
+        "income": income,
+        "expenses": expenses,
+        "investments": investments,
+        "budget_balance": budget_balance,
+    }
 
     # Calculate year summary
     yearly_data["summary"] = {
@@ -1491,12 +1777,15 @@ async def get_yearly_chart_data(
         "months_with_data": len(yearly_data["months"]),
     }
 
-    return yearly_data
+    body = orjson.dumps(yearly_data)
+    with _chart_cache_lock:
+        _yearly_cache[cache_key] = body
+    return Response(content=body, media_type="application/json")
 
 
 # Monthly Analysis Routes
 @app.get("/monthly-analysis", response_class=HTMLResponse)
-async def monthly_analysis(request: Request, db: Session = Depends(get_db)):
+def monthly_analysis(request: Request, db: Session = Depends(get_db)):
     current_user = get_current_user(request, db)
     if not current_user:
         return RedirectResponse("/login", status_code=302)
@@ -1518,165 +1807,107 @@ async def monthly_analysis(request: Request, db: Session = Depends(get_db)):
 
     # Default to current month/year if no data exists
     if not available_periods:
-        current_date = datetime.now()
+        current_month, current_year = current_month_year()
         available_periods = [
             {
-                "month": current_date.strftime("%B"),
-                "year": current_date.year,
-                "display": f"{current_date.strftime('%B')} {current_date.year}",
+                "month": current_month,
+                "year": current_year,
+                "display": f"{current_month} {current_year}",
             }
         ]
 
-    return templates.TemplateResponse(
+    return render(
         "monthly_analysis.html",
-        {
-            "request": request,
-            "user": current_user,
-            "available_periods": available_periods,
-        },
+        request=request,
+        user=current_user,
+        available_periods=available_periods,
     )
 
 
 @app.get("/api/monthly-analysis-data/{year}/{month}")
-async def get_monthly_analysis_data(
+def get_monthly_analysis_data(
     year: int, month: str, request: Request, db: Session = Depends(get_db)
 ):
     current_user = get_current_user(request, db)
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    # Get the specific month's entry
-    entry = (
-        db.query(BudgetEntry)
-        .filter(
-            BudgetEntry.user_id == current_user.id,
-            BudgetEntry.year == year,
-            BudgetEntry.month == month,
-        )
-        .first()
-    )
-
-    if not entry:
+    # Work out the previous month so both entries come back in one query
+    current_month_index = MONTH_INDEX.get(month)
+    if current_month_index is None:
         return {"error": "No data found for the specified month"}
 
-    # Get previous month's data for comparison
-    month_order = [
-        "January",
-        "February",
-        "March",
-        "April",
-        "May",
-        "June",
-        "July",
-        "August",
-        "September",
-        "October",
-        "November",
-        "December",
-    ]
-
-    current_month_index = month_order.index(month)
     if current_month_index == 0:
         prev_month = "December"
         prev_year = year - 1
     else:
-        prev_month = month_order[current_month_index - 1]
+        prev_month = MONTH_ORDER[current_month_index - 1]
         prev_year = year
 
-    prev_entry = (
-        db.query(BudgetEntry)
-        .filter(
+    # Plain rows of just the amount and total columns; no ORM objects needed
+    columns = [
+        column
+        for column in BudgetEntry.__table__.columns
+        if column.name not in ("id", "user_id", "created_at")
+    ]
+    rows = db.execute(
+        select(*columns).where(
             BudgetEntry.user_id == current_user.id,
-            BudgetEntry.year == prev_year,
-            BudgetEntry.month == prev_month,
+            tuple_(BudgetEntry.year, BudgetEntry.month).in_(
+                [(year, month), (prev_year, prev_month)]
+            ),
         )
-        .first()
-    )
+    ).all()
+    entries = {(e.year, e.month): e for e in rows}
+    entry = entries.get((year, month))
+    prev_entry = entries.get((prev_year, prev_month))
 
-    # Calculate current month totals
-    current_income = entry.salary + entry.freelancing_one + entry.freelancing_two
-    current_expenses = (
-        entry.mobile_recharge
-        + entry.wifi
-        + entry.emi_one
-        + entry.emi_two
-        + entry.emi_three
-        + entry.emi_four
-        + entry.food
-        + entry.rent
-        + entry.creditcard_one
-        + entry.creditcard_two
-        + entry.shopping
-        + entry.travel
-        + entry.other_expenses
-    )
-    # Calculate actual investments (only SIP, FD, ETF)
-    current_investments = (
-        entry.sip + entry.fixed_deposit_one + entry.fixed_deposit_two + entry.etf
-    )
+    if not entry:
+        return {"error": "No data found for the specified month"}
+
+    # Current month totals (investments are only SIP, FD, ETF)
+    current_income = entry.total_income
+    current_expenses = entry.total_expenses
+    current_investments = entry.total_investments
     # Calculate budget balance (remaining after expenses and investments)
     current_budget_balance = current_income - current_expenses - current_investments
 
     # Calculate previous month totals if available
     prev_income = prev_expenses = prev_investments = prev_budget_balance = 0
     if prev_entry:
-        prev_income = (
-            prev_entry.salary + prev_entry.freelancing_one + prev_entry.freelancing_two
-        )
-        prev_expenses = (
-            prev_entry.mobile_recharge
-            + prev_entry.wifi
-            + prev_entry.emi_one
-            + prev_entry.emi_two
-            + prev_entry.emi_three
-            + prev_entry.emi_four
-            + prev_entry.food
-            + prev_entry.rent
-            + prev_entry.creditcard_one
-            + prev_entry.creditcard_two
-            + prev_entry.shopping
-            + prev_entry.travel
-            + prev_entry.other_expenses
-        )
-        prev_investments = (
-            prev_entry.sip
-            + prev_entry.fixed_deposit_one
-            + prev_entry.fixed_deposit_two
-            + prev_entry.etf
-        )
+        prev_income = prev_entry.total_income
+        prev_expenses = prev_entry.total_expenses
+        prev_investments = prev_entry.total_investments
         prev_budget_balance = prev_income - prev_expenses - prev_investments
 
-    # Get year-to-date data for context
-    ytd_entries = (
-        db.query(BudgetEntry)
+    # Get year-to-date data for context, summed in one row
+    ytd_income, ytd_expenses, ytd_investments, ytd_months = (
+        db.query(
+            func.coalesce(func.sum(BudgetEntry.total_income), 0),
+            func.coalesce(func.sum(BudgetEntry.total_expenses), 0),
+            func.coalesce(func.sum(BudgetEntry.total_investments), 0),
+            func.count(),
+        )
         .filter(BudgetEntry.user_id == current_user.id, BudgetEntry.year == year)
-        .all()
-    )
-
-    ytd_income = sum(
-        e.salary + e.freelancing_one + e.freelancing_two for e in ytd_entries
-    )
-    ytd_expenses = sum(
-        e.mobile_recharge
-        + e.wifi
-        + e.emi_one
-        + e.emi_two
-        + e.emi_three
-        + e.emi_four
-        + e.food
-        + e.rent
-        + e.creditcard_one
-        + e.creditcard_two
-        + e.shopping
-        + e.travel
-        + e.other_expenses
-        for e in ytd_entries
-    )
-    ytd_investments = sum(
-        e.sip + e.fixed_deposit_one + e.fixed_deposit_two + e.etf for e in ytd_entries
+        .one()
     )
     ytd_budget_balance = ytd_income - ytd_expenses - ytd_investments
 
+    # Largest expense category; the first one wins ties
+    largest_name, largest_value = "Rent", entry.rent
+    if entry.food > largest_value:
+        largest_name, largest_value = "Food", entry.food
+    if entry.emi_total > largest_value:
+        largest_name, largest_value = "EMIs", entry.emi_total
+    if entry.creditcard_total > largest_value:
+        largest_name, largest_value = "Credit Cards", entry.creditcard_total
+    if entry.shopping > largest_value:
+        largest_name, largest_value = "Shopping", entry.shopping
+    if entry.travel > largest_value:
+        largest_name, largest_value = "Travel", entry.travel
+    if entry.other_expenses > largest_value:
+        largest_name, largest_value = "Other", entry.other_expenses
+
     monthly_data = {
         "month": month,
         "year": year,
@@ -1702,11 +1933,8 @@ async def get_monthly_analysis_data(
                 "travel": entry.travel,
                 "other_expenses": entry.other_expenses,
                 "total": current_expenses,
-                "emi_total": entry.emi_one
-                + entry.emi_two
-                + entry.emi_three
-                + entry.emi_four,
-                "creditcard_total": entry.creditcard_one + entry.creditcard_two,
+                "emi_total": entry.emi_total,
+                "creditcard_total": entry.creditcard_total,
                 "utilities_total": entry.mobile_recharge + entry.wifi,
             },
             "investments": {
@@ -1732,10 +1960,10 @@ async def get_monthly_analysis_data(
             "expenses": ytd_expenses,
             "investments": ytd_investments,
             "budget_balance": ytd_budget_balance,
-            "months_count": len(ytd_entries),
-            "avg_monthly_income": ytd_income / max(len(ytd_entries), 1),
-            "avg_monthly_expenses": ytd_expenses / max(len(ytd_entries), 1),
-            "avg_monthly_investments": ytd_investments / max(len(ytd_entries), 1),
+            "months_count": ytd_months,
+            "avg_monthly_income": ytd_income / max(ytd_months, 1),
+            "avg_monthly_expenses": ytd_expenses / max(ytd_months, 1),
+            "avg_monthly_investments": ytd_investments / max(ytd_months, 1),
         },
         "comparisons": {
             "income_change": current_income - prev_income if prev_entry else 0,
@@ -1771,24 +1999,7 @@ async def get_monthly_analysis_data(
                 if current_income > 0
                 else 0
             ),
-            "largest_expense_category": max(
-                [
-                    ("Rent", entry.rent),
-                    ("Food", entry.food),
-                    (
-                        "EMIs",
-                        entry.emi_one
-                        + entry.emi_two
-                        + entry.emi_three
-                        + entry.emi_four,
-                    ),
-                    ("Credit Cards", entry.creditcard_one + entry.creditcard_two),
-                    ("Shopping", entry.shopping),
-                    ("Travel", entry.travel),
-                    ("Other", entry.other_expenses),
-                ],
-                key=lambda x: x[1],
-            ),
+            "largest_expense_category": (largest_name, largest_value),
         },
     }
 
@@ -1796,319 +2007,384 @@ async def get_monthly_analysis_data(
 
 
 # Data Export Routes (CSV/Excel Downloads)
-@app.get("/export/budget", response_class=HTMLResponse)
-async def export_page(request: Request, current_user: User = Depends(get_current_user)):
-    """Data export page"""
-    return templates.TemplateResponse(
-        "export_data.html", {"request": request, "user": current_user}
-    )
-
+EXPORT_SPOOL_SIZE = 10 * 1024 * 1024
+# Worker processes for building Excel files; 0 builds them in the request thread
+EXCEL_PROCESSES = int(os.getenv("EXCEL_PROCESSES", 0))
+_excel_pool = None
+_excel_pool_lock = threading.Lock()
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    excel = "excel"
+    parquet = "parquet"
+    feather = "feather"
+
+    @classmethod
+    def _missing_(cls, value):
+        # Accept any casing, e.g. ?format=Excel
+        if isinstance(value, str):
+            return cls.__members__.get(value.lower())
+
+
+# What each download writes: header row, Excel sheet name, 404 message and,
+# for rows that never need quoting, a CSV line format string
+ExportSpec = namedtuple(
+    "ExportSpec", "headers sheet_name empty_detail line_format", defaults=(None,)
+)
 
-@app.get("/download/budget")
-async def download_budget_data(
-    format: str = "csv",
-    month: str = None,
-    year: int = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """Download budget data in CSV or Excel format"""
-    try:
-        import pandas as pd
-        from fastapi.responses import StreamingResponse
-        import io
+# format -> (file extension, media type) for pyarrow-written downloads
+COLUMNAR_FORMATS = {
+    ExportFormat.parquet: ("parquet", "application/vnd.apache.parquet"),
+    ExportFormat.feather: ("feather", "application/vnd.apache.arrow.file"),
+}
 
-        # Build query
-        query = db.query(BudgetEntry).filter(BudgetEntry.user_id == current_user.id)
 
-        if month and year:
-            query = query.filter(BudgetEntry.month == month, BudgetEntry.year == year)
-        elif year:
-            query = query.filter(BudgetEntry.year == year)
+def export_timestamp(column):
+    # "YYYY-MM-DD HH:MM:SS", or "" when unset, formatted by the database
+    if engine.dialect.name == "postgresql":
+        formatted = func.to_char(column, "YYYY-MM-DD HH24:MI:SS")
+    else:
+        formatted = func.strftime("%Y-%m-%d %H:%M:%S", column)
+    return func.coalesce(formatted, "").label(column.key)
+
+
+# Downloads read just these columns as plain rows, not full ORM objects; each
+# row is already in output order, so it is written out as-is
+BUDGET_EXPORT_COLUMNS = (
+    BudgetEntry.month,
+    BudgetEntry.year,
+    BudgetEntry.salary,
+    BudgetEntry.freelancing_one,
+    BudgetEntry.freelancing_two,
+    BudgetEntry.mobile_recharge,
+    BudgetEntry.wifi,
+    BudgetEntry.food,
+    BudgetEntry.rent,
+    BudgetEntry.emi_one,
+    BudgetEntry.emi_two,
+    BudgetEntry.emi_three,
+    BudgetEntry.emi_four,
+    BudgetEntry.creditcard_one,
+    BudgetEntry.creditcard_two,
+    BudgetEntry.shopping,
+    BudgetEntry.travel,
+    BudgetEntry.other_expenses,
+    BudgetEntry.total_income,
+    BudgetEntry.total_expenses,
+    (BudgetEntry.total_income - BudgetEntry.total_expenses).label("net_savings"),
+    export_timestamp(BudgetEntry.created_at),
+)
+BUCKET_EXPORT_COLUMNS = (
+    BucketList.name,
+    BucketList.category,
+    func.coalesce(BucketList.description, "").label("description"),
+    BucketList.price,
+    func.coalesce(BucketList.priority, "").label("priority"),
+    case((BucketList.is_completed != 0, "Completed"), else_="Pending").label("status"),
+    func.coalesce(BucketList.target_date, "").label("target_date"),
+    export_timestamp(BucketList.created_at),
+    export_timestamp(BucketList.completed_at),
+)
+VARIABLE_EXPORT_COLUMNS = (
+    VariableBudgetEntry.month,
+    VariableBudgetEntry.year,
+    VariableBudgetEntry.description,
+    VariableBudgetEntry.amount,
+    VariableBudgetEntry.category,
+    export_timestamp(VariableBudgetEntry.date_added),
+    VariableBudgetEntry.is_finalized,
+)
 
-        entries = query.all()
 
-        if not entries:
-            raise HTTPException(
-                status_code=404, detail="No data found for the specified criteria"
-            )
+BUDGET_EXPORT_HEADERS = (
+    "Month",
+    "Year",
+    "Salary",
+    "Freelancing_1",
+    "Freelancing_2",
+    "Mobile_Recharge",
+    "WiFi",
+    "Food",
+    "Rent",
+    "EMI_1",
+    "EMI_2",
+    "EMI_3",
+    "EMI_4",
+    "Credit_Card_1",
+    "Credit_Card_2",
+    "Shopping",
+    "Travel",
+    "Other_Expenses",
+    "Total_Income",
+    "Total_Expenses",
+    "Net_Savings",
+    "Created_At",
+)
+# Budget rows are month names, numbers and a formatted timestamp: nothing that
+# needs CSV quoting, so they can skip csv.writer and use one format string
+BUDGET_CSV_LINE = ",".join(["{}"] * len(BUDGET_EXPORT_HEADERS)) + "\n"
+BUCKET_EXPORT_HEADERS = (
+    "Name",
+    "Category",
+    "Description",
+    "Price",
+    "Priority",
+    "Status",
+    "Target_Date",
+    "Created_At",
+    "Completed_At",
+)
+VARIABLE_EXPORT_HEADERS = (
+    "Month",
+    "Year",
+    "Description",
+    "Amount",
+    "Category",
+    "Date_Added",
+    "Is_Finalized",
+)
 
-        # Prepare data for export
-        data = []
-        for entry in entries:
-            total_income = entry.salary + entry.freelancing_one + entry.freelancing_two
-            total_expenses = (
-                entry.mobile_recharge
-                + entry.wifi
-                + entry.food
-                + entry.rent
-                + entry.emi_one
-                + entry.emi_two
-                + entry.emi_three
-                + entry.emi_four
-                + entry.creditcard_one
-                + entry.creditcard_two
-                + entry.shopping
-                + entry.travel
-                + entry.other_expenses
-            )
-            net_savings = total_income - total_expenses
-
-            data.append(
-                {
-                    "Month": entry.month,
-                    "Year": entry.year,
-                    "Salary": entry.salary,
-                    "Freelancing_1": entry.freelancing_one,
-                    "Freelancing_2": entry.freelancing_two,
-                    "Mobile_Recharge": entry.mobile_recharge,
-                    "WiFi": entry.wifi,
-                    "Food": entry.food,
-                    "Rent": entry.rent,
-                    "EMI_1": entry.emi_one,
-                    "EMI_2": entry.emi_two,
-                    "EMI_3": entry.emi_three,
-                    "EMI_4": entry.emi_four,
-                    "Credit_Card_1": entry.creditcard_one,
-                    "Credit_Card_2": entry.creditcard_two,
-                    "Shopping": entry.shopping,
-                    "Travel": entry.travel,
-                    "Other_Expenses": entry.other_expenses,
-                    "Total_Income": total_income,
-                    "Total_Expenses": total_expenses,
-                    "Net_Savings": net_savings,
-                    "Created_At": (
-                        entry.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                        if entry.created_at
-                        else ""
-                    ),
-                }
-            )
+BUDGET_EXPORT = ExportSpec(
+    BUDGET_EXPORT_HEADERS,
+    "Budget Data",
+    "No data found for the specified criteria",
+    BUDGET_CSV_LINE,
+)
+BUCKET_EXPORT = ExportSpec(
+    BUCKET_EXPORT_HEADERS, "Bucket List", "No bucket list items found"
+)
+VARIABLE_EXPORT = ExportSpec(
+    VARIABLE_EXPORT_HEADERS,
+    "Variable Expenses",
+    "No variable expenses found for the specified criteria",
+)
 
-        df = pd.DataFrame(data)
 
-        # Generate filename
-        if month and year:
-            filename = f"budget_data_{month}_{year}"
-        elif year:
-            filename = f"budget_data_{year}"
+class Echo:
+    # File-like sink whose write() hands the formatted line straight back
+    def write(self, value):
+        return value
+
+
+def stream_csv(query, headers, line_format=None):
+    # The request session is closed before the body is sent, so read on our own
+    with SessionLocal() as db:
+        writer = csv.writer(Echo(), lineterminator="\n")
+        yield writer.writerow(headers)
+        rows = query.with_session(db).yield_per(1000)
+        if line_format is not None:
+            # NULL is an empty field, as csv.writer writes it
+            for row in rows:
+                yield line_format.format(
+                    *("" if value is None else value for value in row)
+                )
         else:
-            filename = "budget_data_all"
-
-        # Export based on format
-        if format.lower() == "excel":
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, sheet_name="Budget Data", index=False)
-            output.seek(0)
-
-            return StreamingResponse(
-                io.BytesIO(output.read()),
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={
-                    "Content-Disposition": f"attachment; filename={filename}.xlsx"
-                },
-            )
-        else:  # CSV format
-            output = io.StringIO()
-            df.to_csv(output, index=False)
-            output.seek(0)
-
-            return StreamingResponse(
-                io.BytesIO(output.getvalue().encode("utf-8")),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename={filename}.csv"},
+            for row in rows:
+                yield writer.writerow(row)
+
+
+def stream_file(file, chunk_size=64 * 1024):
+    with file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+def write_workbook(headers, rows, sheet_name, output):
+    # Write-only workbooks append rows without keeping per-cell objects around
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(output)
+
+
+def workbook_bytes(headers, rows, sheet_name):
+    # Runs in an excel_pool() process; rows arrive as a pickled list of tuples
+    output = io.BytesIO()
+    write_workbook(headers, rows, sheet_name, output)
+    return output.getvalue()
+
+
+def excel_pool():
+    global _excel_pool
+    with _excel_pool_lock:
+        if _excel_pool is None:
+            _excel_pool = ProcessPoolExecutor(
+                max_workers=EXCEL_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
             )
+    return _excel_pool
 
-    except ImportError:
-        raise HTTPException(
-            status_code=500,
-            detail="Pandas not installed. Please install with: pip install pandas openpyxl",
+
+def excel_response(query, spec, filename):
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    content_disposition = {
+        "Content-Disposition": f"attachment; filename={filename}.xlsx"
+    }
+    rows = map(tuple, query.yield_per(1000))
+
+    if EXCEL_PROCESSES:
+        # openpyxl holds the GIL, so concurrent exports only overlap across processes
+        content = (
+            excel_pool()
+            .submit(workbook_bytes, spec.headers, list(rows), spec.sheet_name)
+            .result()
+        )
+        return Response(
+            content=content, media_type=media_type, headers=content_disposition
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+    # Small workbooks stay in memory, large ones spill to disk
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    write_workbook(spec.headers, rows, spec.sheet_name, output)
+    output.seek(0)
 
-@app.get("/download/bucket-list")
-async def download_bucket_list(
-    format: str = "csv",
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """Download bucket list data in CSV or Excel format"""
-    try:
-        import pandas as pd
-        from fastapi.responses import StreamingResponse
-        import io
-
-        # Get bucket list items
-        items = db.query(BucketList).filter(BucketList.user_id == current_user.id).all()
-
-        if not items:
-            raise HTTPException(status_code=404, detail="No bucket list items found")
-
-        # Prepare data for export
-        data = []
-        for item in items:
-            data.append(
-                {
-                    "Name": item.name,
-                    "Category": item.category,
-                    "Description": item.description or "",
-                    "Price": item.price,
-                    "Priority": item.priority or "",
-                    "Status": item.status or "Pending",
-                    "Target_Date": (
-                        item.target_date.strftime("%Y-%m-%d")
-                        if item.target_date
-                        else ""
-                    ),
-                    "Notes": item.notes or "",
-                    "Created_At": (
-                        item.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                        if item.created_at
-                        else ""
-                    ),
-                    "Updated_At": (
-                        item.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-                        if item.updated_at
-                        else ""
-                    ),
-                }
-            )
+    return StreamingResponse(
+        stream_file(output), media_type=media_type, headers=content_disposition
+    )
 
-        df = pd.DataFrame(data)
-        filename = "bucket_list_data"
-
-        # Export based on format
-        if format.lower() == "excel":
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, sheet_name="Bucket List", index=False)
-            output.seek(0)
-
-            return StreamingResponse(
-                io.BytesIO(output.read()),
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={
-                    "Content-Disposition": f"attachment; filename={filename}.xlsx"
-                },
-            )
-        else:  # CSV format
-            output = io.StringIO()
-            df.to_csv(output, index=False)
-            output.seek(0)
-
-            return StreamingResponse(
-                io.BytesIO(output.getvalue().encode("utf-8")),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename={filename}.csv"},
-            )
 
-    except ImportError:
+def columnar_response(query, spec, filename, format):
+    if pa is None:
         raise HTTPException(
-            status_code=500,
-            detail="Pandas not installed. Please install with: pip install pandas openpyxl",
+            status_code=501,
+            detail="pyarrow not installed. Please install with: pip install pyarrow",
         )
+    rows = query.all()
+    table = pa.table(dict(zip(spec.headers, map(list, zip(*rows)))))
+
+    extension, media_type = COLUMNAR_FORMATS[format]
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
+    if format is ExportFormat.parquet:
+        pq.write_table(table, output, compression="snappy")
+    else:
+        feather.write_feather(table, output)
+    output.seek(0)
+
+    return StreamingResponse(
+        stream_file(output),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"},
+    )
+
+
+def csv_response(query, spec, filename):
+    return StreamingResponse(
+        stream_csv(query, spec.headers, spec.line_format),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}.csv"},
+    )
+
+
+EXPORT_WRITERS = {
+    ExportFormat.csv: csv_response,
+    ExportFormat.excel: excel_response,
+    ExportFormat.parquet: partial(columnar_response, format=ExportFormat.parquet),
+    ExportFormat.feather: partial(columnar_response, format=ExportFormat.feather),
+}
+
+
+def export_response(query, format, filename, spec):
+    # Shared by every download: empty check, then the writer for the format
+    try:
+        if not query.session.query(query.exists()).scalar():
+            raise HTTPException(status_code=404, detail=spec.empty_detail)
+
+        return EXPORT_WRITERS[format](query, spec, filename)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
 
-@app.get("/download/variable-expenses")
-async def download_variable_expenses(
-    format: str = "csv",
+@app.get("/export/budget", response_class=HTMLResponse)
+def export_page(request: Request, current_user: User = Depends(get_current_user)):
+    """Data export page"""
+    return render(
+        "export_data.html",
+        request=request,
+        user=current_user,
+        columnar_available=pa is not None,
+    )
+
+
+@app.get("/download/budget")
+def download_budget_data(
+    format: ExportFormat = ExportFormat.csv,
     month: str = None,
     year: int = None,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(require_user),
     db: Session = Depends(get_db),
 ):
-    """Download variable expenses data in CSV or Excel format"""
-    try:
-        import pandas as pd
-        from fastapi.responses import StreamingResponse
-        import io
+    """Download budget data in CSV or Excel format"""
+    # Build query
+    query = db.query(*BUDGET_EXPORT_COLUMNS).filter(
+        BudgetEntry.user_id == current_user.id
+    )
 
-        # Build query
-        query = db.query(VariableBudgetEntry).filter(
-            VariableBudgetEntry.user_id == current_user.id
-        )
+    if month and year:
+        query = query.filter(BudgetEntry.month == month, BudgetEntry.year == year)
+    elif year:
+        query = query.filter(BudgetEntry.year == year)
 
-        if month and year:
-            query = query.filter(
-                VariableBudgetEntry.month == month, VariableBudgetEntry.year == year
-            )
-        elif year:
-            query = query.filter(VariableBudgetEntry.year == year)
+    # Generate filename
+    if month and year:
+        filename = f"budget_data_{month}_{year}"
+    elif year:
+        filename = f"budget_data_{year}"
+    else:
+        filename = "budget_data_all"
 
-        expenses = query.all()
+    return export_response(query, format, filename, BUDGET_EXPORT)
 
-        if not expenses:
-            raise HTTPException(
-                status_code=404,
-                detail="No variable expenses found for the specified criteria",
-            )
 
-        # Prepare data for export
-        data = []
-        for expense in expenses:
-            data.append(
-                {
-                    "Month": expense.month,
-                    "Year": expense.year,
-                    "Description": expense.description,
-                    "Amount": expense.amount,
-                    "Category": expense.category,
-                    "Date_Added": (
-                        expense.date_added.strftime("%Y-%m-%d %H:%M:%S")
-                        if expense.date_added
-                        else ""
-                    ),
-                    "Is_Finalized": expense.is_finalized,
-                }
-            )
+@app.get("/download/bucket-list")
+def download_bucket_list(
+    format: ExportFormat = ExportFormat.csv,
+    current_user: User = Depends(require_user),
+    db: Session = Depends(get_db),
+):
+    """Download bucket list data in CSV or Excel format"""
+    query = db.query(*BUCKET_EXPORT_COLUMNS).filter(
+        BucketList.user_id == current_user.id
+    )
 
-        df = pd.DataFrame(data)
+    return export_response(query, format, "bucket_list_data", BUCKET_EXPORT)
 
-        # Generate filename
-        if month and year:
-            filename = f"variable_expenses_{month}_{year}"
-        elif year:
-            filename = f"variable_expenses_{year}"
-        else:
-            filename = "variable_expenses_all"
-
-        # Export based on format
-        if format.lower() == "excel":
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, sheet_name="Variable Expenses", index=False)
-            output.seek(0)
-
-            return StreamingResponse(
-                io.BytesIO(output.read()),
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={
-                    "Content-Disposition": f"attachment; filename={filename}.xlsx"
-                },
-            )
-        else:  # CSV format
-            output = io.StringIO()
-            df.to_csv(output, index=False)
-            output.seek(0)
-
-            return StreamingResponse(
-                io.BytesIO(output.getvalue().encode("utf-8")),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename={filename}.csv"},
-            )
 
-    except ImportError:
-        raise HTTPException(
-            status_code=500,
-            detail="Pandas not installed. Please install with: pip install pandas openpyxl",
+@app.get("/download/variable-expenses")
+def download_variable_expenses(
+    format: ExportFormat = ExportFormat.csv,
+    month: str = None,
+    year: int = None,
+    current_user: User = Depends(require_user),
+    db: Session = Depends(get_db),
+):
+    """Download variable expenses data in CSV or Excel format"""
+    # Build query
+    query = db.query(*VARIABLE_EXPORT_COLUMNS).filter(
+        VariableBudgetEntry.user_id == current_user.id
+    )
+
+    if month and year:
+        query = query.filter(
+            VariableBudgetEntry.month == month, VariableBudgetEntry.year == year
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    elif year:
+        query = query.filter(VariableBudgetEntry.year == year)
+
+    # Generate filename
+    if month and year:
+        filename = f"variable_expenses_{month}_{year}"
+    elif year:
+        filename = f"variable_expenses_{year}"
+    else:
+        filename = "variable_expenses_all"
+
+    return export_response(query, format, filename, VARIABLE_EXPORT)
 
 
 if __name__ == "__main__":